@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from stub_providers import StubCatalog, StubProviders
+
+SOURCE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SCENARIOS = {
+    "spotify": {"mode": "Spotify"},
+    "lastfm": {"mode": "LastFM"},
+}
+LOWER_IS_BETTER = ["library_sync_seconds", "time_to_first_card_seconds", "provider_calls_per_card", "add_seconds_per_artist", "preview_seconds", "peak_rss_mb", "peak_threads"]
+HIGHER_IS_BETTER = ["cards_per_second"]
+ROUTED_HOSTS = {"api.spotify.com", "accounts.spotify.com", "api.deezer.com", "ws.audioscrobbler.com"}
+
+
+class ThreadSampler:
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True, name="Thread_Sampler")
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop_event.set()
+        self.thread.join()
+
+
+def routed_url(stub, url):
+    parts = urllib.parse.urlsplit(url)
+    if parts.hostname not in ROUTED_HOSTS:
+        return url
+    return urllib.parse.urlunsplit(("http", stub.address, f"/{parts.hostname}{parts.path}", parts.query, parts.fragment))
+
+
+def route_providers(stub, lidify):
+    import musicbrainzngs
+    import pylast
+
+    send = requests.adapters.HTTPAdapter.send
+
+    def routed_send(adapter, request, **kwargs):
+        request.url = routed_url(stub, request.url)
+        return send(adapter, request, **kwargs)
+
+    requests.adapters.HTTPAdapter.send = routed_send
+    musicbrainzngs.set_hostname(stub.address, use_https=False)
+
+    class RoutedTransport(pylast.httpx.BaseTransport):
+        transport = pylast.httpx.HTTPTransport()
+
+        def handle_request(self, request):
+            request.url = pylast.httpx.URL(routed_url(stub, str(request.url)))
+            return self.transport.handle_request(request)
+
+        def close(self):
+            pass
+
+    provider_clients = lidify.data_handler.provider_clients
+    lastfm = provider_clients.lastfm
+
+    def routed_lastfm():
+        client = lastfm()
+        client.proxy = {"https://": RoutedTransport()}
+        return client
+
+    provider_clients.lastfm = routed_lastfm
+
+
+class BenchClient:
+    def __init__(self, lidify, timeout):
+        self.client = lidify.socketio.test_client(lidify.app)
+        self.timeout = timeout
+
+    def poll(self):
+        return self.client.get_received()
+
+    def wait_for(self, name, predicate=lambda args: True, timeout=None):
+        deadline = time.perf_counter() + (timeout or self.timeout)
+        while time.perf_counter() < deadline:
+            for event in self.poll():
+                if event["name"] == name and predicate(event["args"][0] if event["args"] else None):
+                    return event["args"][0] if event["args"] else None
+            time.sleep(0.01)
+        raise TimeoutError(f"Timed out waiting for '{name}'")
+
+
+def run_scenario(name, options):
+    os.chdir(tempfile.mkdtemp(prefix=f"lidify-bench-{name}-"))
+    catalog = StubCatalog(options.library_size, options.library_size * options.universe_factor, options.related)
+    stub = StubProviders(catalog, latency_ms=options.latency_ms, error_rate=options.error_rate).start()
+    os.environ.update(
+        {
+            "lidarr_address": stub.url("lidarr"),
+            "lidarr_api_key": "bench",
+            "spotify_client_id": "bench",
+            "spotify_client_secret": "bench",
+            "last_fm_api_key": "bench",
+            "last_fm_api_secret": "bench",
+            "mode": SCENARIOS[name]["mode"],
+            "auto_start": "False",
+            "preview_prefetch": "False",
+        }
+    )
+    sys.path.insert(0, SOURCE_FOLDER)
+    import Lidify
+
+    Lidify.data_handler.lidify_logger.setLevel(options.log_level)
+    route_providers(stub, Lidify)
+
+    with ThreadSampler() as sampler:
+        bench = BenchClient(Lidify, options.timeout)
+        bench.client.emit("sync_artists", {"session": "bench"})
+
+        started = time.perf_counter()
+        bench.client.emit("get_lidarr_artists")
+        bench.wait_for("lidarr_sidebar_update", lambda data: data.get("Status") == "Success")
+        library_sync_seconds = time.perf_counter() - started
+
+        calls_before = stub.snapshot()
+        cards = []
+        started = time.perf_counter()
+        time_to_first_card = None
+        last_request = 0
+        bench.client.emit("start_req", {"selection": "all"})
+        deadline = started + options.timeout
+        while len(cards) < options.cards and time.perf_counter() < deadline:
+            for event in bench.poll():
+                if event["name"] == "more_artists_loaded":
+                    cards.extend(event["args"][0])
+                    if time_to_first_card is None:
+                        time_to_first_card = time.perf_counter() - started
+                elif event["name"] == "new_toast_msg" and event["args"][0]["title"] == "Search Exhausted":
+                    deadline = 0
+            if time_to_first_card is not None and time.perf_counter() - last_request > 0.2:
+                bench.client.emit("load_more_artists")
+                last_request = time.perf_counter()
+            time.sleep(0.01)
+        discovery_seconds = time.perf_counter() - started
+        bench.client.emit("stop_req")
+        discovery_calls = stub.snapshot() - calls_before
+        discovery_calls.pop("images", None)
+
+        added_names = [card["Name"] for card in cards[: options.adds]]
+        final_statuses = {"Added", "Already in Lidarr", "Failed to Add", "Invalid Path"}
+        started = time.perf_counter()
+        bench.client.emit("adder", [urllib.parse.quote(added_name) for added_name in added_names])
+        statuses = {}
+        while len(statuses) < len(added_names) and time.perf_counter() - started < options.timeout:
+            for event in bench.poll():
+                if event["name"] == "refresh_artist" and event["args"][0].get("Status") in final_statuses:
+                    statuses[event["args"][0]["Name"]] = event["args"][0]["Status"]
+            time.sleep(0.01)
+        add_seconds = time.perf_counter() - started
+
+        preview_event = "spotify_preview" if SCENARIOS[name]["mode"] == "Spotify" else "lastfm_preview"
+        preview_seconds = []
+        for card in cards[: options.previews]:
+            started = time.perf_counter()
+            bench.client.emit("preview_req", urllib.parse.quote(card["Name"]))
+            bench.wait_for(preview_event)
+            preview_seconds.append(time.perf_counter() - started)
+
+        bench.client.disconnect()
+
+    stub.stop()
+    return {
+        "library_sync_seconds": round(library_sync_seconds, 3),
+        "time_to_first_card_seconds": round(time_to_first_card, 3) if time_to_first_card is not None else None,
+        "cards": len(cards),
+        "cards_per_second": round(len(cards) / discovery_seconds, 2) if discovery_seconds else 0,
+        "provider_calls": dict(discovery_calls),
+        "provider_calls_per_card": round(sum(discovery_calls.values()) / len(cards), 2) if cards else None,
+        "added": sum(1 for status in statuses.values() if status == "Added"),
+        "add_seconds_per_artist": round(add_seconds / len(added_names), 3) if added_names else None,
+        "preview_seconds": round(sum(preview_seconds) / len(preview_seconds), 3) if preview_seconds else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_threads": sampler.peak,
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_seconds):
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if reference is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            value, expected = metrics.get(metric), reference.get(metric)
+            if value is None or not expected:
+                continue
+            if metric.endswith("_seconds") and abs(value - expected) < min_delta_seconds:
+                continue
+            change = (value - expected) / expected
+            if (metric in LOWER_IS_BETTER and change > tolerance) or (metric in HIGHER_IS_BETTER and change < -tolerance):
+                regressions.append(f"{name}.{metric}: {expected} -> {value} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end Lidify benchmark against local stub providers.")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--library-size", type=int, default=500)
+    parser.add_argument("--universe-factor", type=int, default=20)
+    parser.add_argument("--related", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--adds", type=int, default=3)
+    parser.add_argument("--previews", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta-seconds", type=float, default=0.05, help="Ignore timing changes smaller than this")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    options.scenarios = options.scenarios or list(SCENARIOS)
+    for name in options.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario '{name}'")
+
+    if options.child:
+        print(json.dumps(run_scenario(options.scenarios[0], options)))
+        return
+
+    parameters = {key: getattr(options, key) for key in ("library_size", "universe_factor", "related", "latency_ms", "error_rate", "cards", "adds", "previews")}
+    results = {}
+    for name in options.scenarios:
+        command = [sys.executable, os.path.abspath(__file__), name, "--child"] + [f"--{key.replace('_', '-')}={value}" for key, value in parameters.items()]
+        command += [f"--timeout={options.timeout}", f"--log-level={options.log_level}"]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+        print(f"{name}: {json.dumps(results[name], indent=2)}")
+
+    if options.update_baseline:
+        with open(options.baseline, "w") as file:
+            json.dump({"parameters": parameters, "scenarios": results}, file, indent=4)
+            file.write("\n")
+        print(f"Baseline written to {options.baseline}")
+        return
+
+    if not os.path.exists(options.baseline):
+        print("No baseline found, run with --update-baseline to create one")
+        return
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    if baseline.get("parameters") != parameters:
+        print("Baseline was recorded with different parameters, comparison skipped")
+        return
+    regressions = compare(results, baseline, options.tolerance, options.min_delta_seconds)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {options.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
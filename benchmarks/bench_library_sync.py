@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import requests
+from unidecode import unidecode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from stub_providers import StubCatalog, StubProviders
+
+SOURCE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+class FullRefetch:
+    def __init__(self, lidarr_address):
+        self.lidarr_address = lidarr_address
+        self.full_lidarr_artist_list = []
+        self.lidarr_items = []
+        self.cleaned_lidarr_items = []
+
+    def get_artists_from_lidarr(self, emit):
+        response = requests.get(f"{self.lidarr_address}/api/v1/artist", headers={"X-Api-Key": "bench"}, timeout=120)
+        self.full_lidarr_artist_list = response.json()
+        self.lidarr_items = [{"name": unidecode(artist["artistName"], replace_str=" "), "checked": False} for artist in self.full_lidarr_artist_list]
+        self.lidarr_items.sort(key=lambda x: x["name"].lower())
+        self.cleaned_lidarr_items = [item["name"].lower() for item in self.lidarr_items]
+        emit("lidarr_sidebar_update", {"Status": "Success", "Code": None, "Data": self.lidarr_items, "Running": False})
+
+
+class EmitRecorder:
+    def __init__(self):
+        self.payload_bytes = 0
+
+    def __call__(self, event, data=None, **kwargs):
+        self.payload_bytes += len(json.dumps(data))
+
+
+class StubLidarr:
+    def __init__(self, options):
+        command = [sys.executable, os.path.abspath(__file__), "--serve", f"--library-size={options.library_size}", f"--changes={options.changes}"]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.url = self.process.stdout.readline().strip()
+
+    def command(self, name):
+        self.process.stdin.write(f"{name}\n")
+        self.process.stdin.flush()
+        self.process.stdout.readline()
+
+    def stop(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def serve(options):
+    catalog = StubCatalog(options.library_size, options.library_size + options.changes, 0)
+    stub = StubProviders(catalog, latency_ms=0).start()
+    changes = catalog.names[options.library_size :]
+    print(stub.url("lidarr"), flush=True)
+    for line in sys.stdin:
+        with catalog.lock:
+            if line.strip() == "add":
+                catalog.library.update(changes)
+            else:
+                catalog.library.difference_update(changes)
+        print("ok", flush=True)
+    stub.stop()
+
+
+def measure(sync, setup):
+    setup()
+    started = time.perf_counter()
+    sync(EmitRecorder())
+    seconds = time.perf_counter() - started
+
+    setup()
+    recorder = EmitRecorder()
+    tracemalloc.start()
+    sync(recorder)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 3), "peak_mb": round(peak / 1048576, 1), "retained_mb": round(retained / 1048576, 1), "emitted_kb": round(recorder.payload_bytes / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a full Lidarr library refetch with the incremental library sync against a stub Lidarr.")
+    parser.add_argument("--library-size", type=int, default=20000)
+    parser.add_argument("--changes", type=int, default=100, help="Artists added to Lidarr before the last sync")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.serve:
+        serve(options)
+        return
+
+    stub = StubLidarr(options)
+    os.chdir(tempfile.mkdtemp(prefix="lidify-bench-library-"))
+    os.environ.update({"lidarr_address": stub.url, "auto_start": "False"})
+    for key in ("lidarr_api_key", "discovery_interval_hours"):
+        os.environ.pop(key, None)
+    sys.path.insert(0, SOURCE_FOLDER)
+    import Lidify
+
+    data_handler = Lidify.data_handler
+    data_handler.lidify_logger.setLevel(options.log_level)
+    data_handler.lidarr_api_key = "bench"
+    session = data_handler.get_session("bench")
+
+    def incremental_sync(emit):
+        Lidify.socketio.emit = emit
+        data_handler.get_artists_from_lidarr()
+        data_handler.sidebar_page(session, {"offset": 0, "limit": 100}, "bench")
+
+    def empty_library():
+        data_handler.lidarr_items = []
+        data_handler.library_index.rebuild([])
+
+    def unchanged_library():
+        stub.command("remove")
+        incremental_sync(EmitRecorder())
+
+    def changed_library():
+        unchanged_library()
+        stub.command("add")
+
+    full_refetch = FullRefetch(stub.url)
+    results = {
+        "full_refetch": measure(full_refetch.get_artists_from_lidarr, lambda: None),
+        "incremental_first": measure(incremental_sync, empty_library),
+        "incremental_unchanged": measure(incremental_sync, unchanged_library),
+        "incremental_changed": measure(incremental_sync, changed_library),
+    }
+    stub.stop()
+
+    for name, result in results.items():
+        print(f"{name}: {json.dumps(result)}")
+
+
+if __name__ == "__main__":
+    main()
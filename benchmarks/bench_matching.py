@@ -0,0 +1,58 @@
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+from rapidfuzz import fuzz
+from unidecode import unidecode
+
+os.chdir(tempfile.mkdtemp())
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from Lidify import best_match, normalize_artist_name
+
+QUERIES = ["The Beatles", "Björk", "Sigur Rós", "Mötley Crüe", "Beyoncé", "Simon & Garfunkel", "AC/DC", "Los Lobos", "Motörhead", "The The"]
+FILLERS = ["Beatles Tribute Band", "Bjork Guðmundsdóttir", "Sigur Ros Orchestra", "Motley Crue Revival", "Beyonce Knowles", "Simon and Garfunkel", "ACDC", "Los Lonely Boys", "Motorhead UK", "The Thermals"]
+
+
+def candidate_set(query, size=25):
+    rng = random.Random(query)
+    names = [rng.choice(FILLERS) + " " + str(position) for position in range(size - 2)]
+    names += [unidecode(query), query.upper()] if rng.random() < 0.7 else [rng.choice(FILLERS), rng.choice(FILLERS)]
+    rng.shuffle(names)
+    return [{"name": name, "alias-list": [{"alias": name.replace("&", "and")}]} for name in names]
+
+
+def legacy_match(query, candidates):
+    cleaned = unidecode(query).lower()
+    for candidate in candidates:
+        match_ratio = fuzz.ratio(cleaned, candidate["name"].lower())
+        decoded_match_ratio = fuzz.ratio(unidecode(cleaned), unidecode(candidate["name"].lower()))
+        if match_ratio > 90 or decoded_match_ratio > 90:
+            return candidate
+    return None
+
+
+def batched_match(query, candidates):
+    return best_match(query, candidates, 90, lambda candidate: [candidate["name"]] + [alias["alias"] for alias in candidate["alias-list"]])[0]
+
+
+def main():
+    sets = [(query, candidate_set(query)) for query in QUERIES]
+    for query, candidates in sets:
+        legacy = legacy_match(query, candidates)
+        batched = batched_match(query, candidates)
+        print(f"{query!r:22} legacy={legacy['name'] if legacy else None!r:22} batched={batched['name'] if batched else None!r}")
+
+    number = 200
+    legacy_seconds = timeit.timeit(lambda: [legacy_match(query, candidates) for query, candidates in sets], number=number)
+    normalize_artist_name.cache_clear()
+    batched_seconds = timeit.timeit(lambda: [batched_match(query, candidates) for query, candidates in sets], number=number)
+    lookups = number * len(sets)
+    print(f"legacy:  {legacy_seconds / lookups * 1e6:.1f} us per lookup")
+    print(f"batched: {batched_seconds / lookups * 1e6:.1f} us per lookup")
+
+
+if __name__ == "__main__":
+    main()
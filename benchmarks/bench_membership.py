@@ -0,0 +1,40 @@
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+from unidecode import unidecode
+
+os.chdir(tempfile.mkdtemp())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from stub_providers import StubCatalog
+from Lidify import ArtistIndex, LibraryArtist
+
+LIBRARY_SIZES = [1000, 5000, 15000, 50000]
+QUERY_COUNT = 200
+
+
+def main():
+    catalog = StubCatalog(max(LIBRARY_SIZES), max(LIBRARY_SIZES) * 2, 0)
+    rng = random.Random(1)
+    for library_size in LIBRARY_SIZES:
+        names = catalog.names[:library_size]
+        queries = [catalog.names[rng.randrange(library_size * 2)] for _ in range(QUERY_COUNT)]
+        cleaned_lidarr_items = [unidecode(name).lower() for name in names]
+        index = ArtistIndex()
+        index.rebuild([LibraryArtist(name) for name in names])
+        for query in queries:
+            assert (unidecode(query).lower() in cleaned_lidarr_items) == (query in index)
+
+        number = max(1, 200000 // library_size)
+        list_seconds = timeit.timeit(lambda: [unidecode(query).lower() in cleaned_lidarr_items for query in queries], number=number)
+        index_seconds = timeit.timeit(lambda: [query in index for query in queries], number=number * 20)
+        lookups = number * QUERY_COUNT
+        print(f"{library_size:>6} artists  list scan: {list_seconds / lookups * 1e6:8.1f} us per lookup  index: {index_seconds / (lookups * 20) * 1e6:5.2f} us per lookup")
+
+
+if __name__ == "__main__":
+    main()
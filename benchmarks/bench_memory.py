@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from stub_providers import StubCatalog
+
+SOURCE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+GENRES = ["indie rock", "dream pop", "shoegaze", "post-punk", "alternative", "electronic", "folk", "jazz", "hip hop", "metal"]
+
+
+def provider_data(catalog, count, mode, seed=1):
+    rng = random.Random(seed)
+    related_artists = []
+    for index in range(count):
+        related_artist = {"name": catalog.names[index % len(catalog.names)], "genres": rng.sample(GENRES, 1 + index % 3), "img_link": f"thumbnail/{index:040x}"}
+        if mode == "Spotify":
+            related_artist.update({"popularity": index % 100, "followers": (index * 7919) % 2000000})
+        else:
+            related_artist.update({"genres": [genre.title() for genre in related_artist["genres"]], "play_count": (index * 104729) % 90000000, "listeners": (index * 7919) % 2000000})
+        related_artists.append(related_artist)
+    return json.loads(json.dumps(related_artists))
+
+
+def measure(build):
+    tracemalloc.start()
+    records = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory held by library and recommendation records with plain dicts.")
+    parser.add_argument("--library-size", type=int, default=50000)
+    parser.add_argument("--recommendations", type=int, default=100000)
+    options = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="lidify-bench-memory-"))
+    sys.path.insert(0, SOURCE_FOLDER)
+    import Lidify
+
+    catalog = StubCatalog(options.library_size, max(options.library_size, options.recommendations), 0)
+    library = [(index + 1, name) for index, name in enumerate(catalog.names[: options.library_size])]
+    results = {}
+
+    dict_size, _ = measure(lambda: [{"name": artist_name, "id": artist_id} for artist_id, artist_name in library])
+    record_size, _ = measure(lambda: [Lidify.LibraryArtist(artist_name, artist_id) for artist_id, artist_name in library])
+    results["library"] = (options.library_size, dict_size, record_size)
+
+    for mode in ("Spotify", "LastFM"):
+        related_artists = provider_data(catalog, options.recommendations, mode)
+        if mode == "Spotify":
+            build = lambda related_artist: Lidify.Recommendation(related_artist["name"], genres=[genre.title() for genre in related_artist["genres"]], img_link=related_artist["img_link"], popularity=related_artist["popularity"], followers=related_artist["followers"])
+        else:
+            build = lambda related_artist: Lidify.Recommendation(related_artist["name"], genres=related_artist["genres"], img_link=related_artist["img_link"], play_count=related_artist["play_count"], listeners=related_artist["listeners"])
+        dict_size, _ = measure(lambda: [build(related_artist).card() for related_artist in related_artists])
+        record_size, _ = measure(lambda: [build(related_artist) for related_artist in related_artists])
+        results[f"{mode.lower()}_recommendations"] = (options.recommendations, dict_size, record_size)
+
+    for name, (count, dict_size, record_size) in results.items():
+        print(f"{name}: {count} records, dicts {dict_size / 1048576:.1f} MB ({dict_size / count:.0f} B each), records {record_size / 1048576:.1f} MB ({record_size / count:.0f} B each), {1 - record_size / dict_size:.0%} smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from stub_providers import StubCatalog, StubProviders
+
+SOURCE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+PROVIDER_MODULES = ["spotipy", "pylast", "musicbrainzngs", "rapidfuzz"]
+IMPORT_PROBE = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+import Lidify
+import_seconds = time.perf_counter() - started
+print(json.dumps({"import_seconds": import_seconds, "provider_modules": [name for name in sys.argv[2:] if name in sys.modules]}))
+"""
+
+
+def measure_import(config_dir, env):
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE, os.path.abspath(SOURCE_FOLDER)] + PROVIDER_MODULES, cwd=config_dir, env=env, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_boot(options):
+    os.chdir(options.workdir)
+    catalog = StubCatalog(options.library_size, options.library_size, 0)
+    stub = StubProviders(catalog, latency_ms=options.latency_ms).start()
+    os.environ.update({"lidarr_address": stub.url("lidarr"), "lidarr_api_key": "bench", "mode": "LastFM", "auto_start": "False"})
+    sys.path.insert(0, SOURCE_FOLDER)
+
+    started = time.perf_counter()
+    import Lidify
+
+    boot_seconds = time.perf_counter() - started
+    Lidify.data_handler.lidify_logger.setLevel(options.log_level)
+
+    flask_client = Lidify.app.test_client()
+    started = time.perf_counter()
+    flask_client.get("/")
+    first_render_seconds = time.perf_counter() - started
+
+    client = Lidify.socketio.test_client(Lidify.app)
+    client.emit("sync_artists", {"session": "bench"})
+    started = time.perf_counter()
+    sidebar_seconds = None
+    while sidebar_seconds is None and time.perf_counter() - started < options.timeout:
+        client.emit("side_bar_opened")
+        for event in client.get_received():
+            if event["name"] == "lidarr_sidebar_update" and event["args"][0].get("Status") == "Success":
+                sidebar_seconds = time.perf_counter() - started
+        time.sleep(0.01)
+    client.disconnect()
+    stub.stop()
+    return {
+        "boot_seconds": round(boot_seconds, 3),
+        "first_render_seconds": round(first_render_seconds, 3),
+        "first_sidebar_seconds": round(sidebar_seconds, 3) if sidebar_seconds is not None else None,
+        "provider_modules": [name for name in PROVIDER_MODULES if name in sys.modules],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Lidify import time and time to first response on a cold and a warm start.")
+    parser.add_argument("--library-size", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--repeat", type=int, default=5, help="Number of import timings to take the median of")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.workdir:
+        print(json.dumps(run_boot(options)))
+        return
+
+    env = {key: value for key, value in os.environ.items() if key not in ("lidarr_api_key", "auto_start", "discovery_interval_hours")}
+    imports = [measure_import(tempfile.mkdtemp(prefix="lidify-bench-import-"), env) for _ in range(options.repeat)]
+    import_seconds = sorted(result["import_seconds"] for result in imports)[len(imports) // 2]
+    print(f"import: {json.dumps({'import_seconds': round(import_seconds, 3), 'provider_modules': imports[0]['provider_modules']}, indent=2)}")
+
+    workdir = tempfile.mkdtemp(prefix="lidify-bench-startup-")
+    command = [sys.executable, os.path.abspath(__file__), f"--workdir={workdir}", f"--library-size={options.library_size}", f"--latency-ms={options.latency_ms}", f"--timeout={options.timeout}", f"--log-level={options.log_level}"]
+    for start in ("cold", "warm"):
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        print(f"{start}: {json.dumps(json.loads(output.strip().splitlines()[-1]), indent=2)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import collections
+import http.server
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from xml.sax.saxutils import escape
+
+from unidecode import unidecode
+
+FIRST_WORDS = ["Velvet", "Northern", "Silver", "Hollow", "Electric", "Paper", "Crimson", "Quiet", "Golden", "Broken", "Neon", "Wild", "Lunar", "Iron", "Glass", "Young", "Midnight", "Royal", "Distant", "Pale"]
+SECOND_WORDS = ["Harbor", "Lights", "Wolves", "Engines", "Gardens", "Saints", "Rivers", "Machines", "Tigers", "Echoes", "Pilots", "Sisters", "Orchard", "Parade", "Signals", "Canyon", "Choir", "Atlas", "Motel", "Café"]
+PLACEHOLDER_IMAGE = b"\xff\xd8\xff\xe0" + bytes(2048) + b"\xff\xd9"
+
+
+class StubCatalog:
+    def __init__(self, library_size, universe_size, related_count, seed=1):
+        self.library_size = library_size
+        self.universe_size = max(universe_size, library_size + related_count)
+        self.related_count = related_count
+        self.seed = seed
+        self.names = [self.name(index) for index in range(self.universe_size)]
+        self.indexes = {unidecode(name).lower(): index for index, name in enumerate(self.names)}
+        self.library = {self.names[index] for index in range(library_size)}
+        self.lock = threading.Lock()
+
+    def name(self, index):
+        words = f"{FIRST_WORDS[index % len(FIRST_WORDS)]} {SECOND_WORDS[(index // len(FIRST_WORDS)) % len(SECOND_WORDS)]}"
+        cycle = index // (len(FIRST_WORDS) * len(SECOND_WORDS))
+        return f"The {words} {cycle}" if cycle else words
+
+    def lookup(self, name):
+        return self.indexes.get(unidecode(name).strip().lower())
+
+    def related(self, index):
+        rng = random.Random(self.seed * 1000003 + index)
+        return [related for related in rng.sample(range(self.universe_size), self.related_count + 1) if related != index][: self.related_count]
+
+    def neighbours(self, index, count):
+        return [index] + [(index + offset) % self.universe_size for offset in range(1, count)]
+
+    def add_to_library(self, name):
+        with self.lock:
+            if name in self.library:
+                return False
+            self.library.add(name)
+            return True
+
+
+class StubProviders:
+    def __init__(self, catalog, latency_ms=40, error_rate=0.0, seed=1):
+        self.catalog = catalog
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+        self.server = None
+
+    def start(self):
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.handle(self)
+
+            def do_POST(self):
+                stub.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True, name="Stub_Providers").start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def address(self):
+        return f"127.0.0.1:{self.server.server_address[1]}"
+
+    def url(self, provider):
+        return f"http://{self.address}/{provider}"
+
+    def snapshot(self):
+        with self.lock:
+            return collections.Counter(self.counts)
+
+    def handle(self, handler):
+        parsed = urllib.parse.urlsplit(handler.path)
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        segments = parsed.path.lstrip("/").split("/", 1)
+        provider, path = (segments + [""])[:2]
+        if provider == "ws":
+            provider, path = "musicbrainz.org", parsed.path.lstrip("/")
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+
+        with self.lock:
+            self.counts[provider] += 1
+            failed = provider != "images" and self.rng.random() < self.error_rate
+        if self.latency_ms:
+            time.sleep(self.latency_ms * random.uniform(0.5, 1.5) / 1000)
+
+        routes = {
+            "lidarr": self.lidarr,
+            "accounts.spotify.com": self.spotify_accounts,
+            "api.spotify.com": self.spotify,
+            "ws.audioscrobbler.com": self.lastfm,
+            "api.deezer.com": self.deezer,
+            "musicbrainz.org": self.musicbrainz,
+            "images": self.images,
+        }
+        if provider not in routes:
+            status, content_type, payload, headers = 404, "text/plain", b"Unknown provider", {}
+        elif failed:
+            status, content_type, payload, headers = self.failure(provider)
+        else:
+            status, content_type, payload, headers = routes[provider](handler.command, path, query, body)
+
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(payload)))
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def failure(self, provider):
+        if provider == "ws.audioscrobbler.com":
+            return 200, "text/xml", b'<?xml version="1.0" encoding="utf-8"?><lfm status="failed"><error code="29">Rate Limit Exceeded</error></lfm>', {}
+        return 503, "application/json", b'{"error": "Service Unavailable"}', {"Retry-After": "1"}
+
+    def json_response(self, data, status=200):
+        return status, "application/json", json.dumps(data).encode("utf-8"), {}
+
+    def xml_response(self, text):
+        return 200, "text/xml; charset=utf-8", text.encode("utf-8"), {}
+
+    def image_link(self, index):
+        return f"{self.url('images')}/{index}.jpg"
+
+    def lidarr(self, method, path, query, body):
+        if method == "POST":
+            payload = json.loads(body or b"{}")
+            if not self.catalog.add_to_library(payload.get("ArtistName", "")):
+                return self.json_response([{"errorMessage": "This artist has already been added."}], 400)
+            return self.json_response(payload, 201)
+        with self.catalog.lock:
+            library = sorted(self.catalog.library)
+        artists = [
+            {
+                "id": self.catalog.lookup(name) + 1,
+                "artistName": name,
+                "foreignArtistId": f"00000000-0000-0000-0000-{self.catalog.lookup(name):012d}",
+                "monitored": True,
+                "path": f"/data/media/music/{name}",
+                "genres": ["Rock", "Indie"],
+                "overview": f"{name} is a stub artist. " * 8,
+            }
+            for name in library
+        ]
+        return self.json_response(artists)
+
+    def spotify_accounts(self, method, path, query, body):
+        return self.json_response({"access_token": "stub-token", "token_type": "Bearer", "expires_in": 3600})
+
+    def spotify_artist(self, index):
+        return {
+            "id": f"stub{index}",
+            "name": self.catalog.names[index],
+            "genres": ["indie rock", "dream pop"][: 1 + index % 2],
+            "followers": {"total": (index * 7919) % 2000000},
+            "popularity": index % 100,
+            "images": [{"url": self.image_link(index), "width": width, "height": width} for width in (640, 320, 160)],
+        }
+
+    def spotify(self, method, path, query, body):
+        match = re.fullmatch(r"v1/artists/stub(\d+)/(related-artists|top-tracks)", path)
+        if path == "v1/search":
+            index = self.catalog.lookup(query.get("q", ""))
+            items = [] if index is None else [self.spotify_artist(neighbour) for neighbour in self.catalog.neighbours(index, 10)]
+            return self.json_response({"artists": {"items": items, "total": len(items)}})
+        if match and match.group(2) == "related-artists":
+            return self.json_response({"artists": [self.spotify_artist(related) for related in self.catalog.related(int(match.group(1)))]})
+        if match:
+            index = int(match.group(1))
+            artist = {"id": f"stub{index}", "name": self.catalog.names[index]}
+            tracks = [{"name": f"Track {number}", "artists": [artist], "preview_url": f"{self.url('images')}/{index}-{number}.mp3"} for number in range(10)]
+            return self.json_response({"tracks": tracks})
+        return self.json_response({"error": {"status": 404, "message": "Not found"}}, 404)
+
+    def lastfm(self, method, path, query, body):
+        params = dict(urllib.parse.parse_qsl(body.decode("utf-8")))
+        params.update(query)
+        method_name = params.get("method", "")
+        index = self.catalog.lookup(params.get("artist", ""))
+        if index is None and method_name != "artist.search":
+            return self.xml_response('<?xml version="1.0" encoding="utf-8"?><lfm status="failed"><error code="6">The artist you supplied could not be found</error></lfm>')
+
+        if method_name == "artist.getSimilar":
+            inner = "".join(f"<artist><name>{escape(self.catalog.names[related])}</name><match>{1 - position / 100:.3f}</match></artist>" for position, related in enumerate(self.catalog.related(index)))
+            inner = f'<similarartists artist="{escape(self.catalog.names[index])}">{inner}</similarartists>'
+        elif method_name == "artist.getTopTags":
+            inner = "<toptags>" + "".join(f"<tag><name>{tag}</name><count>{100 - position * 10}</count></tag>" for position, tag in enumerate(["indie", "rock", "dream pop", "shoegaze", "alternative", "post-punk"])) + "</toptags>"
+        elif method_name == "artist.getInfo":
+            name = escape(self.catalog.names[index])
+            inner = f"<artist><name>{name}</name><stats><listeners>{(index * 7919) % 2000000}</listeners><playcount>{(index * 104729) % 90000000}</playcount></stats><bio><summary>{name} summary</summary><content>{name} is a stub artist used for benchmarking.</content></bio></artist>"
+        elif method_name == "artist.search":
+            index = self.catalog.lookup(params.get("artist", ""))
+            matches = [] if index is None else self.catalog.neighbours(index, 10)
+            inner = "<results><opensearch:totalResults>%d</opensearch:totalResults><artistmatches>%s</artistmatches></results>" % (
+                len(matches),
+                "".join(f"<artist><name>{escape(self.catalog.names[match])}</name><listeners>{match}</listeners><image size=\"large\">{self.image_link(match)}</image></artist>" for match in matches),
+            )
+        else:
+            return self.xml_response('<?xml version="1.0" encoding="utf-8"?><lfm status="failed"><error code="3">Invalid Method</error></lfm>')
+        return self.xml_response(f'<?xml version="1.0" encoding="utf-8"?><lfm status="ok" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{inner}</lfm>')
+
+    def deezer(self, method, path, query, body):
+        index = self.catalog.lookup(query.get("q", ""))
+        data = [] if index is None else [{"id": index, "name": self.catalog.names[index], "picture_big": self.image_link(index)}]
+        return self.json_response({"data": data, "total": len(data)})
+
+    def musicbrainz(self, method, path, query, body):
+        match = re.search(r"artist:\((.*)\)", query.get("query", ""))
+        index = self.catalog.lookup(re.sub(r"\\(.)", r"\1", match.group(1))) if match else None
+        matches = [] if index is None else self.catalog.neighbours(index, 5)
+        artists = "".join(
+            f'<artist id="00000000-0000-0000-0000-{match_index:012d}" type="Group" ext:score="{100 - position * 10}"><name>{escape(self.catalog.names[match_index])}</name><sort-name>{escape(self.catalog.names[match_index])}</sort-name></artist>'
+            for position, match_index in enumerate(matches)
+        )
+        return self.xml_response(f'<?xml version="1.0" encoding="UTF-8"?><metadata xmlns="http://musicbrainz.org/ns/mmd-2.0#" xmlns:ext="http://musicbrainz.org/ns/ext#-2.0"><artist-list count="{len(matches)}" offset="0">{artists}</artist-list></metadata>')
+
+    def images(self, method, path, query, body):
+        return 200, "image/jpeg", PLACEHOLDER_IMAGE, {"Cache-Control": "max-age=86400"}
@@ -1,23 +1,1292 @@
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
 import json
 import time
 import logging
+import math
+import mmap
 import os
+import queue
 import random
+import sqlite3
 import string
+import sys
 import threading
 import urllib.parse
-from flask import Flask, render_template, request
-from flask_socketio import SocketIO
+import click
+from flask import Flask, abort, jsonify, redirect, render_template, request, send_file
+from flask_socketio import SocketIO, join_room
 import requests
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-import musicbrainzngs
-from thefuzz import fuzz
 from unidecode import unidecode
-import pylast
+
+
+@functools.lru_cache(maxsize=65536)
+def normalize_artist_name(name):
+    folded = unidecode(name, replace_str=" ").lower()
+    words = "".join(character if character.isalnum() else " " for character in folded.replace("&", " and ")).split()
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    return " ".join(words) or " ".join(folded.split())
+
+
+def best_match(query, candidates, threshold, candidate_names=lambda candidate: [candidate]):
+    from rapidfuzz import fuzz, process
+
+    keys = []
+    owners = []
+    for position, candidate in enumerate(candidates):
+        for name in candidate_names(candidate):
+            if name:
+                keys.append(normalize_artist_name(name))
+                owners.append(position)
+    if not keys:
+        return None, 0
+    choice, score, key_position = process.extractOne(normalize_artist_name(query), keys, scorer=fuzz.ratio, processor=None)
+    return (candidates[owners[key_position]] if score > threshold else None), score
+
+
+def loaded_errors(module_name, *error_names):
+    module = sys.modules.get(module_name)
+    return tuple(getattr(module, error_name) for error_name in error_names) if module else ()
+
+
+def select_thumbnail_url(images, min_width=300):
+    suitable_images = [image for image in images if (image.get("width") or 0) >= min_width]
+    return min(suitable_images, key=lambda image: image["width"])["url"] if suitable_images else images[0]["url"]
+
+
+def format_numbers(count):
+    if count >= 1000000:
+        return f"{count / 1000000:.1f}M"
+    elif count >= 1000:
+        return f"{count / 1000:.1f}K"
+    else:
+        return count
+
+
+class Metrics:
+    latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    descriptions = {
+        "lidify_provider_request_seconds": ("histogram", "Latency of each provider request attempt."),
+        "lidify_provider_errors_total": ("counter", "Failed provider request attempts by kind."),
+        "lidify_cache_requests_total": ("counter", "Cache lookups by cache and result."),
+        "lidify_socket_emits_total": ("counter", "Socket.IO events emitted."),
+        "lidify_socket_emit_bytes_total": ("counter", "JSON payload bytes of emitted Socket.IO events."),
+        "lidify_discovery_stage_seconds": ("histogram", "Time spent in each discovery stage."),
+        "lidify_jobs_active": ("gauge", "Jobs currently running per job queue."),
+        "lidify_job_queue_depth": ("gauge", "Jobs waiting per job queue."),
+        "lidify_threads": ("gauge", "Live threads per pool."),
+        "lidify_discovery_sessions": ("gauge", "Discovery sessions by state."),
+    }
+
+    def __init__(self):
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.counters = collections.defaultdict(float)
+        self.histograms = {}
+        self.gauges = {}
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * (len(self.latency_buckets) + 1), 0.0]
+            histogram[0][bisect.bisect_left(self.latency_buckets, seconds)] += 1
+            histogram[1] += seconds
+
+    def register_gauge(self, name, function):
+        self.gauges[name] = function
+
+    @contextlib.contextmanager
+    def span(self, stage, trace=None, detail=None, parent=None):
+        if not self.enabled and trace is None:
+            yield None
+            return
+        started = time.perf_counter()
+        span_id = trace.open(f"{stage} {detail}" if detail else stage, parent) if trace else None
+        try:
+            yield span_id
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe("lidify_discovery_stage_seconds", elapsed, stage=stage)
+            if trace:
+                trace.close(span_id, elapsed)
+
+    def format_labels(self, labels):
+        if not labels:
+            return ""
+        escaped_labels = [(key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for key, value in labels]
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped_labels) + "}"
+
+    @staticmethod
+    def format_value(value):
+        return str(value) if isinstance(value, int) else repr(float(value))
+
+    def render(self):
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, [list(histogram[0]), histogram[1]]) for key, histogram in self.histograms.items())
+        samples = collections.defaultdict(list)
+        for (name, labels), value in counters:
+            samples[name].append(f"{name}{self.format_labels(labels)} {self.format_value(value)}")
+        for (name, labels), (bucket_counts, total) in histograms:
+            cumulative = 0
+            for bound, count in zip(self.latency_buckets + ("+Inf",), bucket_counts):
+                cumulative += count
+                samples[name].append(f"{name}_bucket{self.format_labels(labels + (('le', bound),))} {cumulative}")
+            samples[name].append(f"{name}_sum{self.format_labels(labels)} {self.format_value(total)}")
+            samples[name].append(f"{name}_count{self.format_labels(labels)} {cumulative}")
+        for name, function in self.gauges.items():
+            try:
+                for labels, value in function():
+                    samples[name].append(f"{name}{self.format_labels(tuple(sorted(labels.items())))} {self.format_value(value)}")
+            except Exception as e:
+                logging.getLogger().error(f"Metrics Gauge Error on '{name}': {str(e)}")
+
+        lines = []
+        for name in sorted(samples):
+            kind, description = self.descriptions.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples[name])
+        return "\n".join(lines) + "\n"
+
+
+class DiscoveryTrace:
+    def __init__(self, label):
+        self.label = label
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.spans = []
+        self.stacks = collections.defaultdict(list)
+
+    def open(self, name, parent=None):
+        with self.lock:
+            stack = self.stacks[threading.get_ident()]
+            if parent is None and stack:
+                parent = stack[-1]
+            self.spans.append([name, parent, time.perf_counter() - self.started, None])
+            stack.append(len(self.spans) - 1)
+            return len(self.spans) - 1
+
+    def close(self, span_id, duration):
+        with self.lock:
+            self.spans[span_id][3] = duration
+            stack = self.stacks[threading.get_ident()]
+            if stack and stack[-1] == span_id:
+                stack.pop()
+
+    def render(self):
+        with self.lock:
+            spans = [list(span) for span in self.spans]
+        children = collections.defaultdict(list)
+        for span_id, span in enumerate(spans):
+            children[span[1]].append(span_id)
+        lines = [f"Discovery trace for {self.label}"]
+        pending = [(span_id, 1) for span_id in reversed(children[None])]
+        while pending:
+            span_id, depth = pending.pop()
+            name, parent, start, duration = spans[span_id]
+            duration_text = f"{duration * 1000:.1f}ms" if duration is not None else "unfinished"
+            lines.append(f"{'  ' * depth}{name}  +{start * 1000:.1f}ms  {duration_text}")
+            pending.extend((child_id, depth + 1) for child_id in reversed(children[span_id]))
+        return "\n".join(lines)
+
+
+class InstrumentedSocketIO(SocketIO):
+    def emit(self, event, *args, **kwargs):
+        if metrics.enabled:
+            metrics.inc("lidify_socket_emits_total", event=event)
+            metrics.inc("lidify_socket_emit_bytes_total", len(json.dumps(args, default=str)), event=event)
+        return super().emit(event, *args, **kwargs)
+
+
+class LibraryArtist:
+    __slots__ = ("name", "artist_id")
+
+    def __init__(self, name, artist_id=None):
+        self.name = name
+        self.artist_id = artist_id
+
+
+class Recommendation:
+    __slots__ = ("name", "genres", "img_link", "status", "popularity", "followers", "play_count", "listeners")
+
+    def __init__(self, name, genres=None, img_link=None, status="", popularity=None, followers=None, play_count=None, listeners=None):
+        self.name = name
+        self.genres = None if genres is None else tuple(sys.intern(genre) for genre in genres)
+        self.img_link = img_link
+        self.status = status
+        self.popularity = popularity
+        self.followers = followers
+        self.play_count = play_count
+        self.listeners = listeners
+
+    def update(self, other):
+        for field in self.__slots__:
+            if field != "status":
+                setattr(self, field, getattr(other, field))
+
+    def row(self):
+        return [getattr(self, field) for field in self.__slots__]
+
+    def card(self):
+        card = {"Name": self.name, "Genre": "Loading...", "Status": self.status, "Img_Link": self.img_link, "Popularity": "", "Followers": ""}
+        if self.genres is not None:
+            card["Genre"] = ", ".join(self.genres) or "Unknown Genre"
+        if self.popularity is not None:
+            card.update({"Popularity": f"Popularity: {self.popularity}/100", "Followers": f"Followers: {format_numbers(self.followers)}"})
+        elif self.play_count is not None:
+            card.update({"Popularity": f"Play Count: {format_numbers(self.play_count)}", "Followers": f"Listeners: {format_numbers(self.listeners)}"})
+        return card
+
+
+class ArtistIndex:
+    def __init__(self):
+        self.records = {}
+
+    def rebuild(self, records):
+        self.records = {normalize_artist_name(record.name): record for record in records}
+
+    def add(self, record):
+        self.records.setdefault(normalize_artist_name(record.name), record)
+
+    def get(self, name):
+        return self.records.get(normalize_artist_name(name))
+
+    def __contains__(self, name):
+        return normalize_artist_name(name) in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+
+class MbidCache:
+    def __init__(self, db_path, negative_ttl_hours):
+        self.negative_ttl_seconds = float(negative_ttl_hours) * 3600
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS mbids (name TEXT PRIMARY KEY, mbid TEXT, resolved_at REAL)")
+
+    def get(self, artist_name):
+        with self.lock:
+            row = self.connection.execute("SELECT mbid, resolved_at FROM mbids WHERE name = ?", (normalize_artist_name(artist_name),)).fetchone()
+        if row is None or (row[0] is None and time.time() - row[1] > self.negative_ttl_seconds):
+            metrics.inc("lidify_cache_requests_total", cache="mbid", result="miss")
+            return False, None
+        metrics.inc("lidify_cache_requests_total", cache="mbid", result="hit")
+        return True, row[0]
+
+    def set(self, artist_name, mbid):
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO mbids (name, mbid, resolved_at) VALUES (?, ?, ?)", (normalize_artist_name(artist_name), mbid, time.time()))
+
+
+class ImageCache:
+    def __init__(self, db_path, thumbnail_folder, negative_ttl_hours, ttl_hours, max_folder_bytes, max_thumbnail_bytes=5 * 1024 * 1024):
+        self.negative_ttl_seconds = float(negative_ttl_hours) * 3600
+        self.ttl_seconds = float(ttl_hours) * 3600
+        self.thumbnail_folder = os.path.abspath(thumbnail_folder)
+        self.max_folder_bytes = max_folder_bytes
+        self.max_thumbnail_bytes = max_thumbnail_bytes
+        if not os.path.exists(thumbnail_folder):
+            os.makedirs(thumbnail_folder)
+        self.lock = threading.Lock()
+        self.pending_links = {}
+        self.writes_since_eviction = 0
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS images (name TEXT PRIMARY KEY, url TEXT, resolved_at REAL)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS thumbnails (key TEXT PRIMARY KEY, url TEXT, content_type TEXT, size INTEGER, last_used REAL)")
+            columns = {row[1] for row in self.connection.execute("PRAGMA table_info(thumbnails)")}
+            if "last_used" not in columns:
+                self.connection.execute("ALTER TABLE thumbnails ADD COLUMN size INTEGER")
+                self.connection.execute("ALTER TABLE thumbnails ADD COLUMN last_used REAL")
+                self.connection.execute("UPDATE thumbnails SET last_used = ?", (time.time(),))
+                for key, in self.connection.execute("SELECT key FROM thumbnails WHERE content_type IS NOT NULL").fetchall():
+                    thumbnail_path = os.path.join(self.thumbnail_folder, key)
+                    if os.path.exists(thumbnail_path):
+                        self.connection.execute("UPDATE thumbnails SET size = ? WHERE key = ?", (os.path.getsize(thumbnail_path), key))
+        self.evict()
+
+    def get_url(self, artist_name):
+        with self.lock:
+            row = self.connection.execute("SELECT url, resolved_at FROM images WHERE name = ?", (normalize_artist_name(artist_name),)).fetchone()
+        if row is None or (row[0] is None and time.time() - row[1] > self.negative_ttl_seconds):
+            metrics.inc("lidify_cache_requests_total", cache="image", result="miss")
+            return False, None
+        metrics.inc("lidify_cache_requests_total", cache="image", result="hit")
+        return True, row[0]
+
+    def set_url(self, artist_name, url):
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO images (name, url, resolved_at) VALUES (?, ?, ?)", (normalize_artist_name(artist_name), url, time.time()))
+
+    def thumbnail_link(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        with self.lock:
+            self.pending_links[key] = url
+        return f"thumbnail/{key}"
+
+    def flush_links(self):
+        with self.lock, self.connection:
+            if not self.pending_links:
+                return
+            self.connection.executemany(
+                "INSERT INTO thumbnails (key, url, last_used) VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET last_used = excluded.last_used",
+                [(key, url, time.time()) for key, url in self.pending_links.items()],
+            )
+            self.writes_since_eviction += len(self.pending_links)
+            self.pending_links = {}
+        if self.writes_since_eviction >= 500:
+            self.evict()
+
+    def source_url(self, key):
+        self.flush_links()
+        with self.lock:
+            row = self.connection.execute("SELECT url FROM thumbnails WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def fetch_thumbnail(self, key, url, session):
+        thumbnail_path = os.path.join(self.thumbnail_folder, key)
+        with self.lock, self.connection:
+            content_type, last_used = self.connection.execute("SELECT content_type, last_used FROM thumbnails WHERE key = ?", (key,)).fetchone() or (None, None)
+            if content_type and os.path.exists(thumbnail_path):
+                if time.time() - (last_used or 0) > 3600:
+                    self.connection.execute("UPDATE thumbnails SET last_used = ? WHERE key = ?", (time.time(), key))
+                return thumbnail_path, content_type
+
+        with session.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "image/jpeg")
+            if not content_type.startswith("image/"):
+                raise Exception(f"Unexpected content type: {content_type}")
+            image_data = b""
+            for chunk in response.iter_content(65536):
+                image_data += chunk
+                if len(image_data) > self.max_thumbnail_bytes:
+                    raise Exception("Image too large")
+
+        temporary_path = f"{thumbnail_path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as thumbnail_file:
+            thumbnail_file.write(image_data)
+        os.replace(temporary_path, thumbnail_path)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO thumbnails (key, url, content_type, size, last_used) VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET content_type = excluded.content_type, size = excluded.size, last_used = excluded.last_used",
+                (key, url, content_type, len(image_data), time.time()),
+            )
+            self.writes_since_eviction += 1
+        if self.writes_since_eviction >= 500:
+            self.evict()
+        return thumbnail_path, content_type
+
+    def evict(self):
+        now = time.time()
+        with self.lock, self.connection:
+            self.writes_since_eviction = 0
+            self.connection.execute("DELETE FROM images WHERE resolved_at < ?", (now - self.ttl_seconds,))
+            expired_keys = [row[0] for row in self.connection.execute("SELECT key FROM thumbnails WHERE last_used < ?", (now - self.ttl_seconds,))]
+            self.connection.executemany("DELETE FROM thumbnails WHERE key = ?", [(key,) for key in expired_keys])
+            folder_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM thumbnails").fetchone()[0]
+            if folder_bytes > self.max_folder_bytes:
+                oldest_keys = []
+                for key, size in self.connection.execute("SELECT key, size FROM thumbnails WHERE size IS NOT NULL ORDER BY last_used"):
+                    if folder_bytes <= self.max_folder_bytes:
+                        break
+                    oldest_keys.append(key)
+                    folder_bytes -= size
+                self.connection.executemany("UPDATE thumbnails SET content_type = NULL, size = NULL WHERE key = ?", [(key,) for key in oldest_keys])
+                expired_keys += oldest_keys
+        for key in expired_keys:
+            try:
+                os.remove(os.path.join(self.thumbnail_folder, key))
+            except FileNotFoundError:
+                pass
+
+
+class MusicBrainzIndex:
+    def __init__(self, index_folder):
+        self.tables = []
+        for file_name in ("names.tsv", "aliases.tsv"):
+            with open(os.path.join(index_folder, file_name), "rb") as index_file:
+                self.tables.append(mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(index_file.name) else b"")
+
+    def lookup(self, artist_name):
+        key = normalize_artist_name(artist_name).encode()
+        for table in self.tables:
+            mbids = self.search_table(table, key)
+            if mbids:
+                return mbids
+        return []
+
+    def search_table(self, table, key):
+        low, high = 0, len(table)
+        while low < high:
+            middle = (low + high) // 2
+            line_start = table.rfind(b"\n", 0, middle) + 1
+            line_end = table.find(b"\n", line_start)
+            if table[line_start:table.find(b"\t", line_start)] < key:
+                low = line_end + 1
+            else:
+                high = line_start
+
+        mbids = []
+        while low < len(table):
+            line_end = table.find(b"\n", low)
+            line_key, mbid = table[low:line_end].split(b"\t")
+            if line_key != key:
+                break
+            if mbid.decode() not in mbids:
+                mbids.append(mbid.decode())
+            low = line_end + 1
+        return mbids
+
+    @staticmethod
+    def read_dump(dump_path):
+        names, aliases = [], []
+        if os.path.isdir(dump_path):
+            artist_ids = {}
+            with open(os.path.join(dump_path, "artist"), encoding="utf-8") as dump_file:
+                for line in dump_file:
+                    columns = line.rstrip("\n").split("\t")
+                    artist_ids[columns[0]] = columns[1]
+                    names.append((columns[2], columns[1]))
+            alias_path = os.path.join(dump_path, "artist_alias")
+            if os.path.exists(alias_path):
+                with open(alias_path, encoding="utf-8") as dump_file:
+                    for line in dump_file:
+                        columns = line.rstrip("\n").split("\t")
+                        if columns[1] in artist_ids:
+                            aliases.append((columns[2], artist_ids[columns[1]]))
+        else:
+            with open(dump_path, encoding="utf-8") as dump_file:
+                for line in dump_file:
+                    if line.strip():
+                        artist = json.loads(line)
+                        names.append((artist["name"], artist["id"]))
+                        aliases.extend((alias["name"], artist["id"]) for alias in artist.get("aliases", []))
+        return names, aliases
+
+    @staticmethod
+    def build(dump_path, index_folder):
+        names, aliases = MusicBrainzIndex.read_dump(dump_path)
+        os.makedirs(index_folder, exist_ok=True)
+        for file_name, entries in (("names.tsv", names), ("aliases.tsv", aliases)):
+            rows = sorted({(normalize_artist_name(name), mbid) for name, mbid in entries if normalize_artist_name(name)})
+            with open(os.path.join(index_folder, file_name), "w", encoding="utf-8") as index_file:
+                index_file.writelines(f"{key}\t{mbid}\n" for key, mbid in rows)
+        return len(names), len(aliases)
+
+
+class ArtistEmitter:
+    def __init__(self, batch_window, max_batch_size):
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.lock = threading.RLock()
+        self.wakeup = threading.Condition(self.lock)
+        self.pending = {}
+        self.deadlines = {}
+        threading.Thread(target=self.run, name="Artist_Emitter", daemon=True).start()
+
+    def queue(self, room, artist):
+        with self.lock:
+            batch = self.pending.setdefault(room, [])
+            batch.append(artist)
+            if len(batch) >= self.max_batch_size:
+                self.flush(room)
+            elif room not in self.deadlines:
+                self.deadlines[room] = time.monotonic() + self.batch_window
+                self.wakeup.notify()
+
+    def run(self):
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                for room in [room for room, deadline in self.deadlines.items() if deadline <= now]:
+                    try:
+                        self.flush(room)
+                    except Exception as e:
+                        logging.getLogger().error(f"Artist Emitter Error: {str(e)}")
+                self.wakeup.wait(min(self.deadlines.values()) - now if self.deadlines else None)
+
+    def flush(self, room):
+        with self.lock:
+            self.deadlines.pop(room, None)
+            batch = self.pending.pop(room, None)
+            if batch:
+                socketio.emit("more_artists_loaded", [artist.card() for artist in batch], room=room)
+
+    def discard(self, room):
+        with self.lock:
+            self.deadlines.pop(room, None)
+            self.pending.pop(room, None)
+
+
+class SessionSaver:
+    def __init__(self, save, delay):
+        self.save = save
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.pending = {}
+        self.deadlines = {}
+        threading.Thread(target=self.run, name="Session_Saver", daemon=True).start()
+
+    def queue(self, session):
+        with self.lock:
+            self.pending[session.session_id] = session
+            if session.session_id not in self.deadlines:
+                self.deadlines[session.session_id] = time.monotonic() + self.delay
+                self.wakeup.notify()
+
+    def run(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                due_sessions = [self.take(session_id) for session_id, deadline in list(self.deadlines.items()) if deadline <= now]
+                if not due_sessions:
+                    self.wakeup.wait(min(self.deadlines.values()) - now if self.deadlines else None)
+            for session in due_sessions:
+                self.save(session)
+
+    def take(self, session_id):
+        self.deadlines.pop(session_id, None)
+        return self.pending.pop(session_id, None)
+
+    def flush(self, session):
+        with self.lock:
+            pending_session = self.take(session.session_id)
+        if pending_session is not None:
+            self.save(pending_session)
+
+    def discard(self, session):
+        with self.lock:
+            self.take(session.session_id)
+
+
+class JobScheduler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queues = {}
+        self.pending_keys = {}
+        self.serial_jobs = {}
+        self.active = collections.Counter()
+
+    def register(self, name, workers, max_pending):
+        self.queues[name] = queue.Queue(maxsize=max_pending)
+        self.pending_keys[name] = set()
+        self.serial_jobs[name] = {}
+        for worker_number in range(workers):
+            thread = threading.Thread(target=self.worker, args=(name,), name=f"{name.title()}_Job_{worker_number}")
+            thread.daemon = True
+            thread.start()
+
+    def submit(self, name, key, function, *args, cancel_event=None, serial_key=None):
+        with self.lock:
+            if key in self.pending_keys[name]:
+                return False
+            try:
+                self.queues[name].put_nowait((key, serial_key, cancel_event, function, args))
+            except queue.Full:
+                logging.getLogger().warning(f"Dropped {name} job {key}: queue full")
+                return False
+            self.pending_keys[name].add(key)
+            return True
+
+    def worker(self, name):
+        while True:
+            job = self.queues[name].get()
+            serial_key = job[1]
+            if serial_key is not None:
+                with self.lock:
+                    if serial_key in self.serial_jobs[name]:
+                        self.serial_jobs[name][serial_key].append(job)
+                        continue
+                    self.serial_jobs[name][serial_key] = collections.deque()
+            while job is not None:
+                self.run(name, *job)
+                job = None
+                if serial_key is not None:
+                    with self.lock:
+                        if self.serial_jobs[name][serial_key]:
+                            job = self.serial_jobs[name][serial_key].popleft()
+                        else:
+                            del self.serial_jobs[name][serial_key]
+
+    def run(self, name, key, serial_key, cancel_event, function, args):
+        with self.lock:
+            self.pending_keys[name].discard(key)
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            self.active[name] += 1
+        try:
+            function(*args)
+        except Exception as e:
+            logging.getLogger().error(f"{name.title()} Job Error: {str(e)}")
+        finally:
+            with self.lock:
+                self.active[name] -= 1
+
+    def depths(self):
+        with self.lock:
+            return {name: job_queue.qsize() + sum(len(waiting) for waiting in self.serial_jobs[name].values()) for name, job_queue in self.queues.items()}
+
+    def running(self):
+        with self.lock:
+            return {name: self.active[name] for name in self.queues}
+
+
+class ProviderUnavailableError(Exception):
+    pass
+
+
+class ProviderCancelledError(ProviderUnavailableError):
+    pass
+
+
+class ProviderQuota:
+    cancel_events = threading.local()
+
+    def __init__(self, provider, rate, burst, max_retries=3, backoff_seconds=1.0, failure_threshold=5, cooldown_seconds=60):
+        self.lock = threading.Lock()
+        self.provider = provider
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.paused_until = 0.0
+        self.failures = 0
+        self.requests = 0
+
+    def acquire(self, cancel_event=None):
+        cancel_event = cancel_event or getattr(self.cancel_events, "event", None)
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ProviderCancelledError(f"{self.provider} request cancelled")
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    raise ProviderUnavailableError(f"{self.provider} paused for {self.paused_until - now:.0f}s after repeated failures")
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requests += 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            if cancel_event is not None:
+                cancel_event.wait(wait)
+            else:
+                time.sleep(wait)
+
+    @classmethod
+    @contextlib.contextmanager
+    def cancelled_by(cls, cancel_event):
+        previous_event = getattr(cls.cancel_events, "event", None)
+        cls.cancel_events.event = cancel_event
+        try:
+            yield
+        finally:
+            cls.cancel_events.event = previous_event
+
+    def is_paused(self):
+        return time.monotonic() < self.paused_until
+
+    def has_spare_capacity(self, reserve=0.5):
+        with self.lock:
+            now = time.monotonic()
+            tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            return now >= self.paused_until and now >= self.blocked_until and tokens >= self.burst * reserve
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+
+    def record_failure(self, retry_after=None):
+        with self.lock:
+            now = time.monotonic()
+            self.failures += 1
+            if self.failures >= self.failure_threshold or (retry_after or 0) > self.cooldown_seconds:
+                self.paused_until = now + max(self.cooldown_seconds, retry_after or 0)
+                self.failures = self.failure_threshold - 1
+                logging.getLogger().warning(f"Pausing {self.provider} requests for {self.paused_until - now:.0f}s")
+            else:
+                delay = retry_after if retry_after is not None else self.backoff_seconds * 2 ** (self.failures - 1) * random.uniform(0.5, 1.5)
+                self.blocked_until = max(self.blocked_until, now + delay)
+
+    def call(self, function, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            started = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                metrics.observe("lidify_provider_request_seconds", time.perf_counter() - started, provider=self.provider)
+                metrics.inc("lidify_provider_errors_total", provider=self.provider, kind=self.error_kind(e))
+                retry_after = self.transient_retry_after(e)
+                if retry_after is False:
+                    raise
+                self.record_failure(retry_after)
+                if attempt == self.max_retries:
+                    raise
+            else:
+                metrics.observe("lidify_provider_request_seconds", time.perf_counter() - started, provider=self.provider)
+                self.record_success()
+                return result
+
+    @staticmethod
+    def error_kind(error):
+        if isinstance(error, loaded_errors("pylast", "WSError")) and error.get_id() == "29":
+            return "429"
+        if isinstance(error, loaded_errors("musicbrainzngs", "ResponseError")) and getattr(error.cause, "code", None):
+            return "429" if error.cause.code == 429 else f"{error.cause.code // 100}xx"
+        if isinstance(error, loaded_errors("pylast", "NetworkError") + loaded_errors("musicbrainzngs", "NetworkError")):
+            return "connection"
+        return "error"
+
+    @staticmethod
+    def transient_retry_after(error):
+        if isinstance(error, loaded_errors("pylast", "WSError")):
+            return None if error.get_id() in ("11", "16", "29") else False
+        if isinstance(error, loaded_errors("pylast", "NetworkError", "MalformedResponseError") + loaded_errors("musicbrainzngs", "NetworkError")):
+            return None
+        if isinstance(error, loaded_errors("musicbrainzngs", "ResponseError")) and getattr(error.cause, "code", None) in (429, 503):
+            return ProviderQuota.parse_retry_after(error.cause.headers.get("Retry-After"))
+        return False
+
+    @staticmethod
+    def parse_retry_after(value):
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return None
+
+
+class RateLimitedAdapter(requests.adapters.HTTPAdapter):
+    retry_statuses = (429, 502, 503, 504)
+    idempotent_methods = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+    def __init__(self, quota, **kwargs):
+        self.quota = quota
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        idempotent = request.method in self.idempotent_methods
+        for attempt in range(self.quota.max_retries + 1):
+            self.quota.acquire()
+            started = time.perf_counter()
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                metrics.observe("lidify_provider_request_seconds", time.perf_counter() - started, provider=self.quota.provider)
+                metrics.inc("lidify_provider_errors_total", provider=self.quota.provider, kind="connection")
+                self.quota.record_failure()
+                if attempt == self.quota.max_retries or not idempotent:
+                    raise
+                continue
+            metrics.observe("lidify_provider_request_seconds", time.perf_counter() - started, provider=self.quota.provider)
+            if response.status_code >= 400:
+                metrics.inc("lidify_provider_errors_total", provider=self.quota.provider, kind=str(response.status_code) if response.status_code == 429 else f"{response.status_code // 100}xx")
+            if response.status_code not in self.retry_statuses:
+                self.quota.record_success()
+                return response
+            self.quota.record_failure(ProviderQuota.parse_retry_after(response.headers.get("Retry-After")))
+            if attempt == self.quota.max_retries or (response.status_code != 429 and not idempotent):
+                return response
+            response.close()
+
+
+class ProviderClients:
+    quota_limits = {"spotify": (10, 10), "lastfm": (5, 5), "deezer": (10, 10), "musicbrainz": (1, 1), "lidarr": (20, 20), "images": (20, 20)}
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.quotas = {provider: ProviderQuota(provider, rate, burst) for provider, (rate, burst) in self.quota_limits.items()}
+        self.sessions = {}
+        self.credentials = {}
+        self.spotify_client = None
+        self.lastfm_client = None
+        self.musicbrainz_client = None
+
+    def configure(self, **credentials):
+        with self.lock:
+            if credentials != self.credentials:
+                self.credentials = credentials
+                self.spotify_client = None
+                self.lastfm_client = None
+                self.musicbrainz_client = None
+
+    def session(self, host):
+        with self.lock:
+            if host not in self.sessions:
+                session = requests.Session()
+                adapter = RateLimitedAdapter(self.quota(host), pool_connections=1, pool_maxsize=10)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.sessions[host] = session
+            return self.sessions[host]
+
+    def quota(self, provider):
+        with self.lock:
+            if provider not in self.quotas:
+                self.quotas[provider] = ProviderQuota(provider, 10, 10)
+            return self.quotas[provider]
+
+    def call(self, provider, function, *args, **kwargs):
+        return self.quota(provider).call(function, *args, **kwargs)
+
+    def spotify(self):
+        with self.lock:
+            if self.spotify_client is None:
+                import spotipy
+                from spotipy.oauth2 import SpotifyClientCredentials
+
+                auth_manager = SpotifyClientCredentials(
+                    client_id=self.credentials["spotify_client_id"],
+                    client_secret=self.credentials["spotify_client_secret"],
+                    cache_handler=spotipy.cache_handler.MemoryCacheHandler(),
+                )
+                self.spotify_client = spotipy.Spotify(retries=0, auth_manager=auth_manager, requests_session=self.session("spotify"))
+            return self.spotify_client
+
+    def lastfm(self):
+        with self.lock:
+            if self.lastfm_client is None:
+                import pylast
+
+                self.lastfm_client = pylast.LastFMNetwork(api_key=self.credentials["last_fm_api_key"], api_secret=self.credentials["last_fm_api_secret"])
+            return self.lastfm_client
+
+    def musicbrainz(self):
+        with self.lock:
+            if self.musicbrainz_client is None:
+                import musicbrainzngs
+
+                musicbrainzngs.set_useragent(self.credentials["app_name"], self.credentials["app_rev"], self.credentials["app_url"])
+                musicbrainzngs.set_rate_limit(False)
+                self.musicbrainz_client = musicbrainzngs
+            return self.musicbrainz_client
+
+
+class RankingEngine:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.expanded_seeds = set()
+        self.scores = {}
+        self.records = {}
+        self.sources = {}
+
+    def add_seed(self, seed, related_artists):
+        seed_key = normalize_artist_name(seed)
+        with self.lock:
+            if seed_key in self.expanded_seeds:
+                return
+            self.expanded_seeds.add(seed_key)
+            for position, related_artist in enumerate(related_artists):
+                key = normalize_artist_name(related_artist["name"])
+                self.scores[key] = self.scores.get(key, 0.0) + 1.0 / math.log2(position + 2)
+                self.sources.setdefault(key, set()).add(seed_key)
+                if len(related_artist) > len(self.records.get(key, ())):
+                    self.records[key] = related_artist
+
+    def sources_of(self, artist_name):
+        with self.lock:
+            return set(self.sources.get(normalize_artist_name(artist_name), ()))
+
+    def score_of(self, artist_name):
+        with self.lock:
+            return self.scores.get(normalize_artist_name(artist_name), 0.0)
+
+    def top(self, count, is_excluded):
+        with self.lock:
+            ranked_keys = sorted(self.scores, key=self.scores.get, reverse=True)
+            records = self.records
+        top_artists = []
+        for key in ranked_keys:
+            if len(top_artists) >= count:
+                break
+            if not is_excluded(records[key]["name"]):
+                top_artists.append(records[key])
+        return top_artists
+
+
+class SeedScheduler:
+    def __init__(self, max_depth, breadth):
+        self.lock = threading.Lock()
+        self.max_depth = max_depth
+        self.breadth = breadth
+        self.seeds = {}
+        self.depth_counts = {}
+
+    def add(self, name, depth=0, parent=None):
+        key = normalize_artist_name(name)
+        with self.lock:
+            if key in self.seeds or depth > self.max_depth:
+                return False
+            if depth > 0 and self.depth_counts.get(depth, 0) >= self.breadth:
+                return False
+            self.seeds[key] = {"name": name, "depth": depth, "parent": parent, "expanded": False, "yield": 0}
+            self.depth_counts[depth] = self.depth_counts.get(depth, 0) + 1
+            return True
+
+    def mark_expanded(self, name, expanded=True):
+        with self.lock:
+            seed = self.seeds.get(normalize_artist_name(name))
+            if seed:
+                seed["expanded"] = expanded
+
+    def record_yield(self, seed_keys):
+        with self.lock:
+            for seed_key in seed_keys:
+                if seed_key in self.seeds:
+                    self.seeds[seed_key]["yield"] += 1
+
+    def best_source(self, seed_keys):
+        with self.lock:
+            sources = [self.seeds[seed_key] for seed_key in seed_keys if seed_key in self.seeds]
+            if not sources:
+                return None, None
+            source = min(sources, key=lambda seed: (seed["depth"], -seed["yield"]))
+            return normalize_artist_name(source["name"]), source["depth"]
+
+    def roots(self, seed_keys):
+        with self.lock:
+            roots = set()
+            for seed_key in seed_keys:
+                while seed_key in self.seeds and self.seeds[seed_key]["parent"] is not None:
+                    seed_key = self.seeds[seed_key]["parent"]
+                roots.add(seed_key)
+            return roots
+
+    def next_seeds(self, count):
+        with self.lock:
+            frontier = [seed for seed in self.seeds.values() if not seed["expanded"]]
+            random.shuffle(frontier)
+            frontier.sort(key=lambda seed: (seed["depth"], -self.seeds[seed["parent"]]["yield"] if seed["parent"] in self.seeds else 0))
+            return [seed["name"] for seed in frontier[:count]]
+
+
+class PreviewCache:
+    def __init__(self, ttl_hours, max_entries):
+        self.lock = threading.Lock()
+        self.ttl_seconds = float(ttl_hours) * 3600
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+
+    def get(self, provider, name):
+        key = (provider, normalize_artist_name(name))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry[0] >= self.ttl_seconds:
+                del self.entries[key]
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+        metrics.inc("lidify_cache_requests_total", cache="preview", result="miss" if entry is None else "hit")
+        return (False, None) if entry is None else (True, entry[1])
+
+    def set(self, provider, name, preview_info):
+        key = (provider, normalize_artist_name(name))
+        with self.lock:
+            self.entries[key] = (time.time(), preview_info)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class SimilarityCache:
+    def __init__(self, db_path, ttl_hours, max_seeds):
+        self.ttl_seconds = {provider: float(hours) * 3600 for provider, hours in ttl_hours.items()}
+        self.max_seeds = max_seeds
+        self.writes_since_eviction = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS seeds (provider TEXT, seed TEXT, fetched_at REAL, last_used REAL, PRIMARY KEY (provider, seed))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS edges (provider TEXT, seed TEXT, position INTEGER, related TEXT, PRIMARY KEY (provider, seed, position))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS artists (provider TEXT, name TEXT, data TEXT, fetched_at REAL, PRIMARY KEY (provider, name))")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS edges_related ON edges (provider, related)")
+        self.evict()
+
+    def key(self, name):
+        return normalize_artist_name(name)
+
+    def is_fresh(self, provider, fetched_at):
+        return time.time() - fetched_at < self.ttl_seconds.get(provider, 0)
+
+    def get_related(self, provider, seed):
+        seed_key = self.key(seed)
+        with self.lock:
+            row = self.connection.execute("SELECT fetched_at FROM seeds WHERE provider = ? AND seed = ?", (provider, seed_key)).fetchone()
+            if row is None or not self.is_fresh(provider, row[0]):
+                metrics.inc("lidify_cache_requests_total", cache="similarity", result="miss")
+                return None
+            rows = self.connection.execute(
+                "SELECT edges.related, artists.data, artists.fetched_at FROM edges LEFT JOIN artists ON artists.provider = edges.provider AND artists.name = edges.related WHERE edges.provider = ? AND edges.seed = ? ORDER BY edges.position",
+                (provider, seed_key),
+            ).fetchall()
+            with self.connection:
+                self.connection.execute("UPDATE seeds SET last_used = ? WHERE provider = ? AND seed = ?", (time.time(), provider, seed_key))
+        metrics.inc("lidify_cache_requests_total", cache="similarity", result="hit")
+
+        related_artists = []
+        for related, data, fetched_at in rows:
+            artist = json.loads(data) if data and self.is_fresh(provider, fetched_at) else {}
+            artist["name"] = related
+            related_artists.append(artist)
+        return related_artists
+
+    def get_related_bulk(self, provider, seeds):
+        seed_keys = list({self.key(seed) for seed in seeds})
+        related_by_seed = {}
+        for chunk_start in range(0, len(seed_keys), 500):
+            chunk = seed_keys[chunk_start : chunk_start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            with self.lock:
+                rows = self.connection.execute(
+                    f"SELECT edges.seed, edges.related, artists.data, artists.fetched_at FROM seeds JOIN edges ON edges.provider = seeds.provider AND edges.seed = seeds.seed LEFT JOIN artists ON artists.provider = edges.provider AND artists.name = edges.related WHERE seeds.provider = ? AND seeds.fetched_at > ? AND seeds.seed IN ({placeholders}) ORDER BY edges.seed, edges.position",
+                    [provider, time.time() - self.ttl_seconds.get(provider, 0)] + chunk,
+                ).fetchall()
+                with self.connection:
+                    self.connection.execute(f"UPDATE seeds SET last_used = ? WHERE provider = ? AND fetched_at > ? AND seed IN ({placeholders})", [time.time(), provider, time.time() - self.ttl_seconds.get(provider, 0)] + chunk)
+            for seed_key, related, data, fetched_at in rows:
+                artist = json.loads(data) if data and self.is_fresh(provider, fetched_at) else {}
+                artist["name"] = related
+                related_by_seed.setdefault(seed_key, []).append(artist)
+        metrics.inc("lidify_cache_requests_total", len(related_by_seed), cache="similarity", result="hit")
+        metrics.inc("lidify_cache_requests_total", len(seed_keys) - len(related_by_seed), cache="similarity", result="miss")
+        return related_by_seed
+
+    def set_related(self, provider, seed, related_artists):
+        seed_key = self.key(seed)
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM edges WHERE provider = ? AND seed = ?", (provider, seed_key))
+            self.connection.execute("INSERT OR REPLACE INTO seeds (provider, seed, fetched_at, last_used) VALUES (?, ?, ?, ?)", (provider, seed_key, now, now))
+            self.connection.executemany("INSERT INTO edges (provider, seed, position, related) VALUES (?, ?, ?, ?)", [(provider, seed_key, position, artist["name"]) for position, artist in enumerate(related_artists)])
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO artists (provider, name, data, fetched_at) VALUES (?, ?, ?, ?)",
+                [(provider, artist["name"], json.dumps({k: v for k, v in artist.items() if k != "name"}), now) for artist in related_artists if len(artist) > 1],
+            )
+            self.writes_since_eviction += 1
+        if self.writes_since_eviction >= 50:
+            self.evict()
+
+    def get_artist(self, provider, name):
+        with self.lock:
+            row = self.connection.execute("SELECT data, fetched_at FROM artists WHERE provider = ? AND name = ?", (provider, name)).fetchone()
+        if row is None or not self.is_fresh(provider, row[1]):
+            return None
+        return json.loads(row[0])
+
+    def set_artist(self, provider, name, data):
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO artists (provider, name, data, fetched_at) VALUES (?, ?, ?, ?)", (provider, name, json.dumps(data), time.time()))
+
+    def evict(self):
+        now = time.time()
+        with self.lock, self.connection:
+            self.writes_since_eviction = 0
+            for provider, ttl in self.ttl_seconds.items():
+                self.connection.execute("DELETE FROM seeds WHERE provider = ? AND fetched_at < ?", (provider, now - ttl))
+                self.connection.execute("DELETE FROM artists WHERE provider = ? AND fetched_at < ?", (provider, now - ttl))
+            seed_count = self.connection.execute("SELECT COUNT(*) FROM seeds").fetchone()[0]
+            if seed_count > self.max_seeds:
+                self.connection.execute("DELETE FROM seeds WHERE rowid IN (SELECT rowid FROM seeds ORDER BY last_used LIMIT ?)", (seed_count - self.max_seeds,))
+            self.connection.execute("DELETE FROM edges WHERE NOT EXISTS (SELECT 1 FROM seeds WHERE seeds.provider = edges.provider AND seeds.seed = edges.seed)")
+            self.connection.execute("DELETE FROM artists WHERE NOT EXISTS (SELECT 1 FROM edges WHERE edges.provider = artists.provider AND edges.related = artists.name)")
+
+
+class RecommendationPool:
+    def __init__(self, db_path, ttl_hours, max_entries):
+        self.ttl_seconds = float(ttl_hours) * 3600
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS pool (provider TEXT, key TEXT, name TEXT, roots TEXT, score REAL, card TEXT, related TEXT, added_at REAL, PRIMARY KEY (provider, key))")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS pool_score ON pool (provider, score)")
+        self.evict()
+
+    def add(self, provider, entries):
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO pool (provider, key, name, roots, score, card, related, added_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(provider, normalize_artist_name(name), name, json.dumps(sorted(roots)), score, json.dumps(recommendation.row()), json.dumps(related_artist), now) for name, roots, score, recommendation, related_artist in entries],
+            )
+        self.evict()
+
+    def names(self, provider):
+        with self.lock:
+            rows = self.connection.execute("SELECT name FROM pool WHERE provider = ? AND added_at > ?", (provider, time.time() - self.ttl_seconds)).fetchall()
+        return [row[0] for row in rows]
+
+    def candidates(self, provider, root_keys=None):
+        with self.lock:
+            rows = self.connection.execute("SELECT name, roots FROM pool WHERE provider = ? AND added_at > ? ORDER BY score DESC", (provider, time.time() - self.ttl_seconds)).fetchall()
+        for name, roots in rows:
+            if root_keys is None or not root_keys.isdisjoint(json.loads(roots)):
+                yield name
+
+    def entries(self, provider, names):
+        entries = {}
+        for chunk_start in range(0, len(names), 500):
+            chunk = [normalize_artist_name(name) for name in names[chunk_start : chunk_start + 500]]
+            placeholders = ", ".join("?" * len(chunk))
+            with self.lock:
+                rows = self.connection.execute(f"SELECT name, card, related FROM pool WHERE provider = ? AND key IN ({placeholders})", [provider] + chunk).fetchall()
+            for name, card, related_artist in rows:
+                card = json.loads(card)
+                if isinstance(card, list):
+                    entries[name] = (Recommendation(*card), json.loads(related_artist))
+        return entries
+
+    def discard(self, provider, names):
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM pool WHERE provider = ? AND key = ?", [(provider, normalize_artist_name(name)) for name in names])
+
+    def evict(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM pool WHERE added_at < ?", (time.time() - self.ttl_seconds,))
+            entry_count = self.connection.execute("SELECT COUNT(*) FROM pool").fetchone()[0]
+            if entry_count > self.max_entries:
+                self.connection.execute("DELETE FROM pool WHERE rowid IN (SELECT rowid FROM pool ORDER BY score, added_at LIMIT ?)", (entry_count - self.max_entries,))
+
+
+class SqliteStateStore:
+    def __init__(self, db_path):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, version INTEGER, value TEXT)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, owner TEXT, expires_at REAL)")
+
+    def get(self, key):
+        with self.lock:
+            row = self.connection.execute("SELECT version, value FROM state WHERE key = ?", (key,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else (0, None)
+
+    def version(self, key):
+        with self.lock:
+            row = self.connection.execute("SELECT version FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def set(self, key, value):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO state (key, version, value) VALUES (?, 1, ?) ON CONFLICT(key) DO UPDATE SET version = version + 1, value = excluded.value",
+                (key, json.dumps(value)),
+            )
+            return self.connection.execute("SELECT version FROM state WHERE key = ?", (key,)).fetchone()[0]
+
+    def delete(self, key):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def acquire(self, name, owner, ttl_seconds):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM locks WHERE name = ? AND expires_at < ?", (name, time.time()))
+            self.connection.execute("INSERT OR IGNORE INTO locks (name, owner, expires_at) VALUES (?, ?, ?)", (name, owner, time.time() + ttl_seconds))
+            return self.connection.execute("SELECT owner FROM locks WHERE name = ?", (name,)).fetchone()[0] == owner
+
+
+class RedisStateStore:
+    def __init__(self, url, prefix="lidify"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        version, value = self.client.hmget(f"{self.prefix}:{key}", "version", "value")
+        return (int(version), json.loads(value)) if value is not None else (0, None)
+
+    def version(self, key):
+        version = self.client.hget(f"{self.prefix}:{key}", "version")
+        return int(version) if version is not None else 0
+
+    def set(self, key, value):
+        pipeline = self.client.pipeline()
+        pipeline.hincrby(f"{self.prefix}:{key}", "version", 1)
+        pipeline.hset(f"{self.prefix}:{key}", "value", json.dumps(value))
+        return pipeline.execute()[0]
+
+    def delete(self, key):
+        self.client.delete(f"{self.prefix}:{key}")
+
+    def acquire(self, name, owner, ttl_seconds):
+        lock_key = f"{self.prefix}:lock:{name}"
+        return bool(self.client.set(lock_key, owner, nx=True, ex=max(1, int(ttl_seconds)))) or self.client.get(lock_key) == owner.encode()
+
+
+class DiscoverySession:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.room = f"discovery-{session_id}"
+        self.lock = threading.Lock()
+        self.connected_sids = set()
+        self.last_seen = time.time()
+        self.selected_names = set()
+        self.artists_to_use_in_search = []
+        self.recommended_artists = []
+        self.recommendation_index = ArtistIndex()
+        self.claimed_artist_names = set()
+        self.stop_event = threading.Event()
+        self.stop_event.set()
+        self.search_in_progress_flag = False
+        self.new_found_artists_counter = 0
+        self.generation = 0
+        self.ranking_engine = RankingEngine()
+        self.seed_scheduler = SeedScheduler(0, 0)
+        self.search_lock = threading.Lock()
+        self.prefetch_lock = threading.Lock()
+        self.prefetch_buffer = []
+        self.trace = None
+        self.call_budget = None
+        self.store_version = 0
+
+    def snapshot(self):
+        with self.lock:
+            return {"selected": sorted(self.selected_names), "artists": [artist.row() for artist in self.recommended_artists], "generation": self.generation}
+
+    def restore(self, snapshot):
+        with self.lock:
+            self.selected_names = set(snapshot["selected"])
+            self.recommended_artists = [Recommendation(*row) for row in snapshot["artists"] if isinstance(row, list)]
+            self.recommendation_index.rebuild(self.recommended_artists)
+            self.claimed_artist_names = {normalize_artist_name(artist.name) for artist in self.recommended_artists}
+            self.generation = snapshot["generation"]
 
 
 class DataHandler:
+    settings_form_keys = ("lidarr_address", "lidarr_api_key", "root_folder_path", "spotify_client_id", "spotify_client_secret")
+
     def __init__(self):
         logging.basicConfig(level=logging.INFO, format="%(message)s")
         self.lidify_logger = logging.getLogger()
@@ -32,19 +1301,76 @@ class DataHandler:
         self.lidify_logger.warning(f"{app_name_text} Version: {release_version}\n")
         self.lidify_logger.warning(f"{'*' * 50}")
 
-        self.search_in_progress_flag = False
-        self.new_found_artists_counter = 0
-        self.clients_connected_counter = 0
         self.config_folder = "config"
-        self.recommended_artists = []
         self.lidarr_items = []
-        self.cleaned_lidarr_items = []
-        self.stop_event = threading.Event()
-        self.stop_event.set()
+        self.library_index = ArtistIndex()
+        self.library_version = 0
+        self.library_keys_cache = (None, [])
+        self.library_filter_cache = (None, None, [])
+        self.sessions_lock = threading.RLock()
+        self.sessions = {}
+        self.sid_sessions = {}
+        self.session_idle_seconds = 3600
+        self.artist_emitter = ArtistEmitter(batch_window=0.25, max_batch_size=10)
+        self.session_saver = SessionSaver(self.save_session, delay=2)
+        self.search_workers = {"Spotify": 4, "LastFM": 3}
+        self.recommendation_batch_size = 40
+        self.preview_cache = PreviewCache(24, 2000)
+        self.preview_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="Preview_Prefetch")
+        self.enrichment_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="LastFM_Enrichment")
         if not os.path.exists(self.config_folder):
             os.makedirs(self.config_folder)
+        state_backend_url = os.environ.get("state_backend_url", "")
+        if state_backend_url.startswith(("redis://", "rediss://", "unix://")):
+            self.state_store = RedisStateStore(state_backend_url)
+        else:
+            self.state_store = SqliteStateStore(os.path.join(self.config_folder, "state.db"))
+        self.settings_store_version = 0
+        self.library_store_version = 0
         self.load_environ_or_config_settings()
-        if self.auto_start:
+        metrics.enabled = self.enable_metrics
+        self.similarity_cache = SimilarityCache(
+            os.path.join(self.config_folder, "similarity_cache.db"),
+            {"Spotify": self.spotify_cache_ttl_hours, "LastFM": self.lastfm_cache_ttl_hours},
+            self.similarity_cache_max_seeds,
+        )
+        self.recommendation_pool = RecommendationPool(os.path.join(self.config_folder, "recommendation_pool.db"), self.recommendation_pool_ttl_hours, self.recommendation_pool_max_entries)
+        self.provider_clients = ProviderClients()
+        self.configure_provider_clients()
+        self.library_snapshot_file = os.path.join(self.config_folder, "lidarr_library.json")
+        self.load_library_snapshot()
+        self.mbid_cache = MbidCache(os.path.join(self.config_folder, "mbid_cache.db"), negative_ttl_hours=24)
+        self.image_cache = ImageCache(
+            os.path.join(self.config_folder, "image_cache.db"),
+            os.path.join(self.config_folder, "thumbnails"),
+            negative_ttl_hours=24,
+            ttl_hours=self.image_cache_ttl_hours,
+            max_folder_bytes=self.thumbnail_cache_max_mb * 1024 * 1024,
+        )
+        self.musicbrainz_index_folder = os.path.join(self.config_folder, "musicbrainz_index")
+        self.musicbrainz_index = None
+        if os.path.exists(os.path.join(self.musicbrainz_index_folder, "names.tsv")):
+            try:
+                self.musicbrainz_index = MusicBrainzIndex(self.musicbrainz_index_folder)
+                self.lidify_logger.info(f"Loaded local MusicBrainz index")
+            except Exception as e:
+                self.lidify_logger.error(f"Error Loading MusicBrainz Index: {str(e)}")
+        self.add_queue_lock = threading.Lock()
+        self.pending_additions = set()
+        self.job_scheduler = JobScheduler()
+        self.job_scheduler.register("lidarr", workers=1, max_pending=4)
+        self.job_scheduler.register("discovery", workers=4, max_pending=64)
+        self.job_scheduler.register("preview", workers=2, max_pending=32)
+        self.job_scheduler.register("musicbrainz", workers=1, max_pending=1000)
+        self.job_scheduler.register("lidarr_add", workers=1, max_pending=1000)
+        self.job_scheduler.register("prefetch", workers=2, max_pending=64)
+        metrics.register_gauge("lidify_job_queue_depth", lambda: [({"queue": name}, depth) for name, depth in self.job_scheduler.depths().items()])
+        metrics.register_gauge("lidify_jobs_active", lambda: [({"queue": name}, count) for name, count in self.job_scheduler.running().items()])
+        metrics.register_gauge("lidify_threads", self.thread_pool_sizes)
+        metrics.register_gauge("lidify_discovery_sessions", self.session_states)
+        if self.lidarr_api_key and self.state_store.acquire("library_refresh", f"{os.uname().nodename}:{os.getpid()}", 60):
+            self.job_scheduler.submit("lidarr", "get_artists", self.get_artists_from_lidarr)
+        if self.auto_start and self.state_store.acquire("auto_start", f"{os.uname().nodename}:{os.getpid()}", self.auto_start_delay + 60):
             try:
                 auto_start_thread = threading.Timer(self.auto_start_delay, self.automated_startup)
                 auto_start_thread.daemon = True
@@ -52,6 +1378,9 @@ class DataHandler:
 
             except Exception as e:
                 self.lidify_logger.error(f"Auto Start Error: {str(e)}")
+        if self.discovery_interval_hours:
+            discovery_daemon_thread = threading.Thread(target=self.discovery_daemon, name="Discovery_Daemon", daemon=True)
+            discovery_daemon_thread.start()
 
     def load_environ_or_config_settings(self):
         # Defaults
@@ -62,6 +1391,7 @@ class DataHandler:
             "spotify_client_id": "",
             "spotify_client_secret": "",
             "fallback_to_top_result": False,
+            "match_threshold": 90,
             "lidarr_api_timeout": 120.0,
             "quality_profile_id": 1,
             "metadata_profile_id": 1,
@@ -75,6 +1405,21 @@ class DataHandler:
             "mode": "Spotify",
             "auto_start": False,
             "auto_start_delay": 60,
+            "spotify_cache_ttl_hours": 168,
+            "lastfm_cache_ttl_hours": 336,
+            "similarity_cache_max_seeds": 20000,
+            "image_cache_ttl_hours": 720,
+            "thumbnail_cache_max_mb": 500,
+            "seed_expansion_depth": 1,
+            "seed_expansion_breadth": 200,
+            "prefetch_batches": 1,
+            "preview_prefetch": False,
+            "enable_metrics": True,
+            "trace_discovery": False,
+            "discovery_interval_hours": 0,
+            "discovery_call_budget": 300,
+            "recommendation_pool_ttl_hours": 168,
+            "recommendation_pool_max_entries": 5000,
         }
 
         # Load settings from environmental variables (which take precedence) over the configuration file.
@@ -85,6 +1430,8 @@ class DataHandler:
         self.spotify_client_secret = os.environ.get("spotify_client_secret", "")
         fallback_to_top_result = os.environ.get("fallback_to_top_result", "")
         self.fallback_to_top_result = fallback_to_top_result.lower() == "true" if fallback_to_top_result != "" else ""
+        match_threshold = os.environ.get("match_threshold", "")
+        self.match_threshold = int(match_threshold) if match_threshold else ""
         lidarr_api_timeout = os.environ.get("lidarr_api_timeout", "")
         self.lidarr_api_timeout = float(lidarr_api_timeout) if lidarr_api_timeout else ""
         quality_profile_id = os.environ.get("quality_profile_id", "")
@@ -105,8 +1452,38 @@ class DataHandler:
         self.auto_start = auto_start.lower() == "true" if auto_start != "" else ""
         auto_start_delay = os.environ.get("auto_start_delay", "")
         self.auto_start_delay = float(auto_start_delay) if auto_start_delay else ""
-
-        # Load variables from the configuration file if not set by environmental variables.
+        spotify_cache_ttl_hours = os.environ.get("spotify_cache_ttl_hours", "")
+        self.spotify_cache_ttl_hours = float(spotify_cache_ttl_hours) if spotify_cache_ttl_hours else ""
+        lastfm_cache_ttl_hours = os.environ.get("lastfm_cache_ttl_hours", "")
+        self.lastfm_cache_ttl_hours = float(lastfm_cache_ttl_hours) if lastfm_cache_ttl_hours else ""
+        similarity_cache_max_seeds = os.environ.get("similarity_cache_max_seeds", "")
+        self.similarity_cache_max_seeds = int(similarity_cache_max_seeds) if similarity_cache_max_seeds else ""
+        image_cache_ttl_hours = os.environ.get("image_cache_ttl_hours", "")
+        self.image_cache_ttl_hours = float(image_cache_ttl_hours) if image_cache_ttl_hours else ""
+        thumbnail_cache_max_mb = os.environ.get("thumbnail_cache_max_mb", "")
+        self.thumbnail_cache_max_mb = int(thumbnail_cache_max_mb) if thumbnail_cache_max_mb else ""
+        seed_expansion_depth = os.environ.get("seed_expansion_depth", "")
+        self.seed_expansion_depth = int(seed_expansion_depth) if seed_expansion_depth else ""
+        seed_expansion_breadth = os.environ.get("seed_expansion_breadth", "")
+        self.seed_expansion_breadth = int(seed_expansion_breadth) if seed_expansion_breadth else ""
+        prefetch_batches = os.environ.get("prefetch_batches", "")
+        self.prefetch_batches = int(prefetch_batches) if prefetch_batches else ""
+        preview_prefetch = os.environ.get("preview_prefetch", "")
+        self.preview_prefetch = preview_prefetch.lower() == "true" if preview_prefetch != "" else ""
+        enable_metrics = os.environ.get("enable_metrics", "")
+        self.enable_metrics = enable_metrics.lower() == "true" if enable_metrics != "" else ""
+        trace_discovery = os.environ.get("trace_discovery", "")
+        self.trace_discovery = trace_discovery.lower() == "true" if trace_discovery != "" else ""
+        discovery_interval_hours = os.environ.get("discovery_interval_hours", "")
+        self.discovery_interval_hours = float(discovery_interval_hours) if discovery_interval_hours else ""
+        discovery_call_budget = os.environ.get("discovery_call_budget", "")
+        self.discovery_call_budget = int(discovery_call_budget) if discovery_call_budget else ""
+        recommendation_pool_ttl_hours = os.environ.get("recommendation_pool_ttl_hours", "")
+        self.recommendation_pool_ttl_hours = float(recommendation_pool_ttl_hours) if recommendation_pool_ttl_hours else ""
+        recommendation_pool_max_entries = os.environ.get("recommendation_pool_max_entries", "")
+        self.recommendation_pool_max_entries = int(recommendation_pool_max_entries) if recommendation_pool_max_entries else ""
+
+        # Load variables from the configuration file, then the shared state store, if not set by environmental variables.
         try:
             self.settings_config_file = os.path.join(self.config_folder, "settings_config.json")
             if os.path.exists(self.settings_config_file):
@@ -119,6 +1496,14 @@ class DataHandler:
         except Exception as e:
             self.lidify_logger.error(f"Error Loading Config: {str(e)}")
 
+        try:
+            self.settings_store_version, ret = self.state_store.get("settings")
+            for key in ret or {}:
+                if getattr(self, key) == "":
+                    setattr(self, key, ret[key])
+        except Exception as e:
+            self.lidify_logger.error(f"Error Loading Shared Config: {str(e)}")
+
         # Load defaults if not set by an environmental variable or configuration file.
         for key, value in default_settings.items():
             if getattr(self, key) == "":
@@ -128,306 +1513,864 @@ class DataHandler:
         self.save_config_to_file()
 
     def automated_startup(self):
-        self.get_artists_from_lidarr(checked=True)
-        artists = [x["name"] for x in self.lidarr_items]
-        self.start(artists)
-
-    def connection(self):
-        if self.recommended_artists:
-            if self.clients_connected_counter == 0:
-                if len(self.recommended_artists) > 25:
-                    self.recommended_artists = random.sample(self.recommended_artists, 25)
+        self.get_artists_from_lidarr()
+        artists = [item.name for item in self.lidarr_items]
+        self.start(self.get_session("auto"), artists)
+
+    def discovery_daemon(self):
+        owner = f"{os.uname().nodename}:{os.getpid()}"
+        interval_seconds = float(self.discovery_interval_hours) * 3600
+        time.sleep(self.auto_start_delay)
+        while True:
+            if self.state_store.acquire("discovery_daemon", owner, interval_seconds + 60):
+                try:
+                    self.run_scheduled_discovery()
+                except Exception as e:
+                    self.lidify_logger.error(f"Scheduled Discovery Error: {str(e)}")
+            time.sleep(interval_seconds)
+
+    def discovery_provider_calls(self):
+        return sum(self.provider_clients.quota(provider).requests for provider in (self.mode.lower(), "deezer"))
+
+    def run_scheduled_discovery(self):
+        self.refresh_shared_state()
+        self.get_artists_from_lidarr()
+        self.recommendation_pool.evict()
+        self.recommendation_pool.discard(self.mode, [artist_name for artist_name in self.recommendation_pool.names(self.mode) if artist_name in self.library_index])
+
+        session = DiscoverySession("scheduled")
+        session.artists_to_use_in_search = [item.name for item in self.lidarr_items]
+        session.claimed_artist_names = {normalize_artist_name(artist_name) for artist_name in self.recommendation_pool.names(self.mode)}
+        session.seed_scheduler = SeedScheduler(self.seed_expansion_depth, self.seed_expansion_breadth)
+        for artist_name in session.artists_to_use_in_search:
+            session.seed_scheduler.add(artist_name)
+        for seed_key, related_artists in self.similarity_cache.get_related_bulk(self.mode, session.artists_to_use_in_search).items():
+            session.ranking_engine.add_seed(seed_key, related_artists)
+            session.seed_scheduler.mark_expanded(seed_key)
+
+        session.call_budget = self.discovery_provider_calls() + self.discovery_call_budget
+        session.stop_event.clear()
+        pooled_count = 0
+        self.lidify_logger.info(f"Scheduled discovery started with a budget of {self.discovery_call_budget} {self.mode} calls")
+        while not session.stop_event.is_set() and not self.provider_clients.quota(self.mode.lower()).is_paused():
+            recommendation_batch = self.build_recommendation_batch(session)
+            if not recommendation_batch:
+                break
+            entries = []
+            for exclusive_artist, related_artist in recommendation_batch:
+                if self.mode == "LastFM" and "genres" not in related_artist and self.discovery_provider_calls() < session.call_budget:
+                    try:
+                        self.fetch_lastfm_details(self.provider_clients.lastfm(), related_artist)
+                        exclusive_artist = self.lastfm_recommendation(related_artist)
+                    except Exception as e:
+                        self.lidify_logger.error(f"LastFM Enrichment Error on artist - '{related_artist['name']}': {str(e)}")
+                roots = session.seed_scheduler.roots(session.ranking_engine.sources_of(related_artist["name"]))
+                entries.append((related_artist["name"], roots, session.ranking_engine.score_of(related_artist["name"]), exclusive_artist, related_artist))
+            self.image_cache.flush_links()
+            self.recommendation_pool.add(self.mode, entries)
+            pooled_count += len(entries)
+            if self.discovery_provider_calls() >= session.call_budget:
+                break
+
+        session.stop_event.set()
+        self.lidify_logger.info(f"Scheduled discovery added {pooled_count} artists to the recommendation pool")
+
+    def get_session(self, session_id):
+        with self.sessions_lock:
+            self.expire_sessions()
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = DiscoverySession(session_id)
+                session.store_version, snapshot = self.state_store.get(f"session:{session_id}")
+                if snapshot is None:
+                    version, snapshot = self.state_store.get("session:auto")
+                if snapshot is not None:
+                    session.restore(snapshot)
+            elif self.state_store.version(f"session:{session_id}") != session.store_version:
+                session.store_version, snapshot = self.state_store.get(f"session:{session_id}")
+                if snapshot is not None:
+                    session.restore(snapshot)
+                    self.lidify_logger.info(f"Reloaded discovery session {session_id} saved by another worker")
+            session.last_seen = time.time()
+            return session
+
+    def session_for_sid(self, sid):
+        with self.sessions_lock:
+            return self.get_session(self.sid_sessions.get(sid, sid))
+
+    def expire_sessions(self):
+        now = time.time()
+        for session_id, session in list(self.sessions.items()):
+            if session_id != "auto" and not session.connected_sids and now - session.last_seen > self.session_idle_seconds:
+                self.stop(session)
+                self.artist_emitter.discard(session.room)
+                self.session_saver.discard(session)
+                self.state_store.delete(f"session:{session_id}")
+                del self.sessions[session_id]
+                self.lidify_logger.info(f"Expired idle discovery session: {session_id}")
+
+    def save_session(self, session):
+        self.session_saver.discard(session)
+        try:
+            session.store_version = self.state_store.set(f"session:{session.session_id}", session.snapshot())
+        except Exception as e:
+            self.lidify_logger.error(f"Error Saving Session: {str(e)}")
+
+    def refresh_shared_state(self):
+        try:
+            if self.state_store.version("settings") != self.settings_store_version:
+                self.settings_store_version, settings = self.state_store.get("settings")
+                for key in self.settings_form_keys:
+                    if key in settings and not os.environ.get(key):
+                        setattr(self, key, settings[key])
+                self.configure_provider_clients()
+            if self.state_store.version("library") != self.library_store_version:
+                self.load_library_snapshot()
+        except Exception as e:
+            self.lidify_logger.error(f"Error Refreshing Shared State: {str(e)}")
+
+    def sync_artists(self, data, sid):
+        self.refresh_shared_state()
+        with self.sessions_lock:
+            session = self.get_session(data.get("session") or sid)
+            self.sid_sessions[sid] = session.session_id
+            first_connection = not session.connected_sids
+            session.connected_sids.add(sid)
+
+        pooled_batch = []
+        if not session.recommended_artists and session.stop_event.is_set():
+            pooled_batch = self.take_pooled_batch(session, any_roots=True)
+
+        with session.lock:
+            served_from_pool = bool(pooled_batch) and not session.recommended_artists
+            if served_from_pool:
+                for exclusive_artist, related_artist in pooled_batch:
+                    session.recommended_artists.append(exclusive_artist)
+                    session.recommendation_index.add(exclusive_artist)
+                    self.artist_emitter.queue(session.room, exclusive_artist)
+
+            if first_connection and not served_from_pool and data.get("generation") is None and session.recommended_artists:
+                self.artist_emitter.discard(session.room)
+                if len(session.recommended_artists) > 25:
+                    session.recommended_artists = random.sample(session.recommended_artists, 25)
+                    session.recommendation_index.rebuild(session.recommended_artists)
                 else:
                     self.lidify_logger.info(f"Shuffling Artists")
-                    random.shuffle(self.recommended_artists)
-            socketio.emit("more_artists_loaded", self.recommended_artists)
-
-        self.clients_connected_counter += 1
-
-    def disconnection(self):
-        self.clients_connected_counter = max(0, self.clients_connected_counter - 1)
+                    random.shuffle(session.recommended_artists)
+                session.generation += 1
+
+            self.artist_emitter.flush(session.room)
+            join_room(session.room, sid=sid)
+            received = data.get("received", 0) if data.get("generation") == session.generation else 0
+            if received == 0:
+                socketio.emit("clear", {"generation": session.generation}, room=sid)
+            missed_artists = session.recommended_artists[received:]
+            if missed_artists:
+                socketio.emit("more_artists_loaded", [artist.card() for artist in missed_artists], room=sid)
+
+        if served_from_pool:
+            self.save_session(session)
+        elif pooled_batch:
+            self.release_claims(session, pooled_batch)
+
+    def disconnection(self, sid):
+        with self.sessions_lock:
+            session = self.sessions.get(self.sid_sessions.pop(sid, sid))
+            if session is not None:
+                session.connected_sids.discard(sid)
+                session.last_seen = time.time()
+        if session is not None and not session.connected_sids:
+            self.session_saver.flush(session)
+
+    def session_states(self):
+        with self.sessions_lock:
+            sessions = list(self.sessions.values())
+        running = sum(1 for session in sessions if not session.stop_event.is_set())
+        return [({"state": "running"}, running), ({"state": "idle"}, len(sessions) - running)]
+
+    def thread_pool_sizes(self):
+        pools = collections.Counter()
+        for thread in threading.enumerate():
+            prefix, _, suffix = thread.name.rpartition("_")
+            if thread.name.startswith(("Thread-", "Dummy-")):
+                pools["Unnamed"] += 1
+            else:
+                pools[prefix if suffix.isdigit() else thread.name] += 1
+        return [({"pool": pool}, count) for pool, count in sorted(pools.items())]
 
-    def start(self, data):
+    def start(self, session, data):
         try:
-            socketio.emit("clear")
-            self.new_found_artists_counter = 1
-            self.artists_to_use_in_search = []
-            self.recommended_artists = []
-
-            for item in self.lidarr_items:
-                item_name = item["name"]
-                if item_name in data:
-                    item["checked"] = True
-                    self.artists_to_use_in_search.append(item_name)
+            self.refresh_shared_state()
+            session.new_found_artists_counter = 1
+            session.artists_to_use_in_search = []
+            self.clear_prefetch_buffer(session)
+            with session.lock:
+                self.artist_emitter.discard(session.room)
+                session.generation += 1
+                socketio.emit("clear", {"generation": session.generation}, room=session.room)
+                session.recommended_artists = []
+                session.recommendation_index.rebuild([])
+                session.claimed_artist_names = set()
+
+            if isinstance(data, dict):
+                selection = data.get("selection", "checked")
+                if selection == "all":
+                    selected_items = self.lidarr_items
+                elif selection == "filter":
+                    selected_items = self.filter_library(data.get("query", ""))
                 else:
-                    item["checked"] = False
-
-            if self.artists_to_use_in_search:
-                self.stop_event.clear()
+                    selected_items = [item for item in self.lidarr_items if item.name in session.selected_names]
+                selected_names = {item.name for item in selected_items}
+            else:
+                selected_names = set(data)
+
+            session.artists_to_use_in_search = [item.name for item in self.lidarr_items if item.name in selected_names]
+            session.selected_names = set(session.artists_to_use_in_search)
+
+            session.ranking_engine = RankingEngine()
+            session.seed_scheduler = SeedScheduler(self.seed_expansion_depth, self.seed_expansion_breadth)
+            for artist_name in session.artists_to_use_in_search:
+                session.seed_scheduler.add(artist_name)
+            for seed_key, related_artists in self.similarity_cache.get_related_bulk(self.mode, session.artists_to_use_in_search).items():
+                session.ranking_engine.add_seed(seed_key, related_artists)
+                session.seed_scheduler.mark_expanded(seed_key)
+            self.save_session(session)
+
+            if session.artists_to_use_in_search:
+                session.stop_event.clear()
             else:
-                self.stop_event.set()
+                session.stop_event.set()
                 raise Exception("No Lidarr Artists Selected")
 
         except Exception as e:
             self.lidify_logger.error(f"Statup Error: {str(e)}")
-            self.stop_event.set()
-            ret = {"Status": "Error", "Code": str(e), "Data": self.lidarr_items, "Running": not self.stop_event.is_set()}
-            socketio.emit("lidarr_sidebar_update", ret)
+            session.stop_event.set()
+            ret = {"Status": "Error", "Code": str(e), "Total": len(self.lidarr_items), "Running": not session.stop_event.is_set()}
+            socketio.emit("lidarr_sidebar_update", ret, room=session.room)
+
+        else:
+            self.find_similar_artists(session)
+
+    def filter_library(self, query):
+        query_key = normalize_artist_name(query)
+        if not query_key:
+            return self.lidarr_items
+        if self.library_filter_cache[:2] != (self.library_version, query_key):
+            prefix_matches, substring_matches = [], []
+            for item_key, item in zip(self.library_search_keys(), self.lidarr_items):
+                if item_key.startswith(query_key):
+                    prefix_matches.append(item)
+                elif query_key in item_key:
+                    substring_matches.append(item)
+            self.library_filter_cache = (self.library_version, query_key, prefix_matches + substring_matches)
+        return self.library_filter_cache[2]
+
+    def library_search_keys(self):
+        if self.library_keys_cache[0] != self.library_version:
+            self.library_keys_cache = (self.library_version, [normalize_artist_name(item.name) for item in self.lidarr_items])
+        return self.library_keys_cache[1]
+
+    def sidebar_page(self, session, data, sid):
+        self.refresh_shared_state()
+        offset = max(0, int(data.get("offset", 0)))
+        limit = min(max(1, int(data.get("limit", 100))), 500)
+        query = data.get("query", "")
+        items = self.filter_library(query)
+        ret = {
+            "Items": [{"name": item.name, "checked": item.name in session.selected_names} for item in items[offset : offset + limit]],
+            "Offset": offset,
+            "Total": len(items),
+            "Query": query,
+            "Checked": sum(1 for artist_name in session.selected_names if artist_name in self.library_index),
+            "AllChecked": bool(items) and all(item.name in session.selected_names for item in items),
+            "Running": not session.stop_event.is_set(),
+        }
+        socketio.emit("sidebar_page", ret, room=sid)
 
+    def sidebar_check(self, session, data):
+        if data.get("all"):
+            artist_names = {item.name for item in self.filter_library(data.get("query", ""))}
         else:
-            self.find_similar_artists()
+            item = self.library_index.get(data.get("name", ""))
+            artist_names = {item.name} if item else set()
+        if data.get("checked"):
+            session.selected_names |= artist_names
+        else:
+            session.selected_names -= artist_names
+        self.session_saver.queue(session)
 
-    def get_artists_from_lidarr(self, checked=False):
+    def get_artists_from_lidarr(self):
         try:
             self.lidify_logger.info(f"Getting Artists from Lidarr")
-            self.lidarr_items = []
             endpoint = f"{self.lidarr_address}/api/v1/artist"
             headers = {"X-Api-Key": self.lidarr_api_key}
-            response = requests.get(endpoint, headers=headers, timeout=self.lidarr_api_timeout)
+            response = self.provider_clients.session("lidarr").get(endpoint, headers=headers, timeout=self.lidarr_api_timeout, stream=True)
 
             if response.status_code == 200:
-                self.full_lidarr_artist_list = response.json()
-                self.lidarr_items = [{"name": unidecode(artist["artistName"], replace_str=" "), "checked": checked} for artist in self.full_lidarr_artist_list]
-                self.lidarr_items.sort(key=lambda x: x["name"].lower())
-                self.cleaned_lidarr_items = [item["name"].lower() for item in self.lidarr_items]
-                status = "Success"
-                data = self.lidarr_items
+                response.encoding = "utf-8"
+                remote_artists = {artist["id"]: unidecode(artist["artistName"], replace_str=" ") for artist in self.iter_json_array(response.iter_content(chunk_size=65536, decode_unicode=True))}
+                added, removed = self.apply_library_changes(remote_artists)
+                if added or removed:
+                    self.save_library_snapshot()
+                self.lidify_logger.info(f"Lidarr library synced: {len(added)} added, {len(removed)} removed")
+                ret = {"Status": "Success", "Code": None, "Total": len(self.lidarr_items), "Changes": {"Added": len(added), "Removed": len(removed)}}
             else:
-                status = "Error"
-                data = response.text
-
-            ret = {"Status": status, "Code": response.status_code if status == "Error" else None, "Data": data, "Running": not self.stop_event.is_set()}
+                ret = {"Status": "Error", "Code": response.status_code, "Data": response.text}
 
         except Exception as e:
             self.lidify_logger.error(f"Getting Artist Error: {str(e)}")
-            ret = {"Status": "Error", "Code": 500, "Data": str(e), "Running": not self.stop_event.is_set()}
+            ret = {"Status": "Error", "Code": 500, "Data": str(e)}
 
         finally:
-            socketio.emit("lidarr_sidebar_update", ret)
+            with self.sessions_lock:
+                sessions = list(self.sessions.values())
+            for session in sessions:
+                socketio.emit("lidarr_sidebar_update", dict(ret, Running=not session.stop_event.is_set()), room=session.room)
+
+    def iter_json_array(self, chunks):
+        decoder = json.JSONDecoder()
+        buffer = ""
+        expected = "["
+        for chunk in chunks:
+            buffer += chunk
+            position = 0
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n":
+                    position += 1
+                if position >= len(buffer):
+                    break
+                if expected == "[" and buffer[position] == "[":
+                    expected = "item or ]"
+                elif expected in ("item or ]", ", or ]") and buffer[position] == "]":
+                    expected = "end"
+                elif expected == ", or ]" and buffer[position] == ",":
+                    expected = "item"
+                elif expected in ("item", "item or ]"):
+                    try:
+                        item, end = decoder.raw_decode(buffer, position)
+                    except json.JSONDecodeError:
+                        break
+                    if end >= len(buffer):
+                        break
+                    yield item
+                    expected = ", or ]"
+                    position = end
+                    continue
+                else:
+                    raise ValueError(f"Malformed Lidarr artist list: expected {expected} at {buffer[position:position + 40]!r}")
+                position += 1
+            buffer = buffer[position:]
+        if expected != "end" or buffer.strip():
+            raise ValueError(f"Truncated Lidarr artist list: expected {expected} at {buffer[:40]!r}")
+
+    def apply_library_changes(self, remote_artists):
+        synced_items = {item.artist_id: item for item in self.lidarr_items if item.artist_id is not None}
+        unsynced_items = {normalize_artist_name(item.name): item for item in self.lidarr_items if item.artist_id is None}
+        removed = [item for artist_id, item in synced_items.items() if remote_artists.get(artist_id) != item.name]
+        added = []
+        adopted = False
+        for artist_id, artist_name in remote_artists.items():
+            item = synced_items.get(artist_id)
+            if item and item.name == artist_name:
+                continue
+            item = unsynced_items.pop(normalize_artist_name(artist_name), None)
+            if item:
+                item.artist_id = artist_id
+                adopted = True
+            else:
+                added.append(LibraryArtist(artist_name, artist_id))
+        removed.extend(unsynced_items.values())
+
+        if added or removed or adopted:
+            removed_items = {id(item) for item in removed}
+            self.lidarr_items = [item for item in self.lidarr_items if id(item) not in removed_items] + added
+            self.lidarr_items.sort(key=lambda item: item.name.lower())
+            self.library_index.rebuild(self.lidarr_items)
+            self.library_version += 1
+        return added, removed
+
+    def load_library_snapshot(self):
+        try:
+            self.library_store_version, snapshot = self.state_store.get("library")
+            if snapshot is None and os.path.exists(self.library_snapshot_file):
+                with open(self.library_snapshot_file, "r") as json_file:
+                    snapshot = json.load(json_file)
+            if snapshot is not None:
+                self.lidarr_items = sorted((LibraryArtist(artist_name, artist_id) for artist_id, artist_name in snapshot["artists"]), key=lambda item: item.name.lower())
+                self.library_index.rebuild(self.lidarr_items)
+                self.library_version += 1
+                self.lidify_logger.info(f"Loaded {len(self.lidarr_items)} Lidarr artists from snapshot")
+        except Exception as e:
+            self.lidify_logger.error(f"Error Loading Library Snapshot: {str(e)}")
 
-    def find_similar_artists(self):
-        if self.stop_event.is_set() or self.search_in_progress_flag:
+    def save_library_snapshot(self):
+        try:
+            self.library_store_version = self.state_store.set("library", {"artists": [[item.artist_id, item.name] for item in self.lidarr_items]})
+        except Exception as e:
+            self.lidify_logger.error(f"Error Saving Library Snapshot: {str(e)}")
+
+    def find_similar_artists(self, session):
+        if session.stop_event.is_set() or session.search_in_progress_flag:
             return
-        elif self.mode == "Spotify" and self.new_found_artists_counter > 0:
+        elif self.mode in self.search_workers and session.new_found_artists_counter > 0:
             try:
-                self.lidify_logger.info(f"Searching for new artists via {self.mode}")
-                self.new_found_artists_counter = 0
-                self.search_in_progress_flag = True
-                random_artists = random.sample(self.artists_to_use_in_search, min(7, len(self.artists_to_use_in_search)))
-
-                sp = spotipy.Spotify(retries=0, auth_manager=SpotifyClientCredentials(client_id=self.spotify_client_id, client_secret=self.spotify_client_secret))
-
-                for artist_name in random_artists:
-                    if self.stop_event.is_set():
-                        break
-                    search_id = None
-                    results = sp.search(q=artist_name, type="artist")
-                    items = results.get("artists", {}).get("items", [])
-                    search_id = items[0]["id"]
-                    related_artists = sp.artist_related_artists(search_id)
-                    for related_artist in related_artists["artists"]:
-                        if self.stop_event.is_set():
-                            break
-                        cleaned_artist = unidecode(related_artist.get("name")).lower()
-                        if cleaned_artist not in self.cleaned_lidarr_items:
-                            for item in self.recommended_artists:
-                                if related_artist.get("name") == item["Name"]:
-                                    break
-                            else:
-                                genres = ", ".join([genre.title() for genre in related_artist.get("genres", [])]) if related_artist.get("genres") else "Unknown Genre"
-                                followers = self.format_numbers(related_artist.get("followers", {}).get("total", 0))
-                                pop = related_artist.get("popularity", "0")
-                                img_link = related_artist.get("images")[0]["url"] if related_artist.get("images") else None
-                                exclusive_artist = {
-                                    "Name": related_artist["name"],
-                                    "Genre": genres,
-                                    "Status": "",
-                                    "Img_Link": img_link,
-                                    "Popularity": f"Popularity: {pop}/100",
-                                    "Followers": f"Followers: {followers}",
-                                }
-                                self.recommended_artists.append(exclusive_artist)
-                                socketio.emit("more_artists_loaded", [exclusive_artist])
-                                self.new_found_artists_counter += 1
-
-                if self.new_found_artists_counter == 0:
+                session.search_in_progress_flag = True
+                generation = session.generation
+                session.trace = DiscoveryTrace(f"session '{session.session_id}' generation {generation}") if self.trace_discovery else None
+                with metrics.span("batch", session.trace):
+                    with session.search_lock:
+                        recommendation_batch = self.take_prefetched_batch(session, generation)
+                        if recommendation_batch is None:
+                            recommendation_batch = self.take_pooled_batch(session) or self.build_recommendation_batch(session)
+
+                    session.new_found_artists_counter = 0
+                    with metrics.span("publish", session.trace):
+                        self.publish_recommendation_batch(session, recommendation_batch, generation)
+
+                if session.new_found_artists_counter == 0 and self.provider_clients.quota(self.mode.lower()).is_paused():
+                    session.new_found_artists_counter = 1
+                    self.lidify_logger.warning(f"{self.mode} Paused - Too many failed requests")
+                    socketio.emit("new_toast_msg", {"title": f"{self.mode} Paused", "message": "Too many failed requests, try loading more artists shortly"}, room=session.room)
+
+                elif session.new_found_artists_counter == 0:
                     self.lidify_logger.info("Search Exhausted - Try selecting more artists from existing Lidarr library")
-                    socketio.emit("new_toast_msg", {"title": "Search Exhausted", "message": "Try selecting more artists from existing Lidarr library"})
+                    socketio.emit("new_toast_msg", {"title": "Search Exhausted", "message": "Try selecting more artists from existing Lidarr library"}, room=session.room)
 
             except Exception as e:
-                self.lidify_logger.error(f"Spotify Error: {str(e)}")
+                self.lidify_logger.error(f"{self.mode} Error: {str(e)}")
 
             finally:
-                self.search_in_progress_flag = False
+                if session.trace:
+                    self.lidify_logger.info(session.trace.render())
+                    session.trace = None
+                session.search_in_progress_flag = False
+
+            self.schedule_prefetch(session)
 
-        elif self.mode == "LastFM" and self.new_found_artists_counter > 0:
+        elif session.new_found_artists_counter == 0:
             try:
-                self.lidify_logger.info(f"Searching for new artists via {self.mode}")
-                self.new_found_artists_counter = 0
-                self.search_in_progress_flag = True
-                random_artists = random.sample(self.artists_to_use_in_search, min(7, len(self.artists_to_use_in_search)))
-
-                lfm = pylast.LastFMNetwork(api_key=self.last_fm_api_key, api_secret=self.last_fm_api_secret)
-                for artist_name in random_artists:
-                    if self.stop_event.is_set():
-                        break
-                    search_id = None
+                session.search_in_progress_flag = True
+                self.lidify_logger.info("Search Exhausted - Try selecting more artists from existing Lidarr library")
+                socketio.emit("new_toast_msg", {"title": "Search Exhausted", "message": "Try selecting more artists from existing Lidarr library"}, room=session.room)
+                time.sleep(2)
 
-                    try:
-                        chosen_artist = lfm.get_artist(artist_name)
-                        related_artists = chosen_artist.get_similar()
+            except Exception as e:
+                self.lidify_logger.error(f"Search Exhausted Error: {str(e)}")
 
-                    except Exception as e:
-                        self.lidify_logger.error(f"Error with LastFM on artist - '{artist_name}': {str(e)}")
-                        self.lidify_logger.info("Trying next artist...")
+            finally:
+                session.search_in_progress_flag = False
+
+    def take_pooled_batch(self, session, any_roots=False):
+        root_keys = None if any_roots else {normalize_artist_name(artist_name) for artist_name in session.artists_to_use_in_search}
+        claimed_names = []
+        with metrics.span("pool", session.trace):
+            for artist_name in self.recommendation_pool.candidates(self.mode, root_keys):
+                if len(claimed_names) >= self.recommendation_batch_size:
+                    break
+                if self.claim_related_artist(session, artist_name):
+                    claimed_names.append(artist_name)
+            entries = self.recommendation_pool.entries(self.mode, claimed_names)
+        recommendation_batch = []
+        for artist_name in claimed_names:
+            if artist_name in entries:
+                exclusive_artist, related_artist = entries[artist_name]
+                exclusive_artist.status = ""
+                if related_artist.get("img_link") and exclusive_artist.img_link.startswith("thumbnail/"):
+                    exclusive_artist.img_link = self.image_cache.thumbnail_link(related_artist["img_link"])
+                recommendation_batch.append((exclusive_artist, related_artist))
+        self.image_cache.flush_links()
+        if recommendation_batch:
+            self.lidify_logger.info(f"Serving {len(recommendation_batch)} artists from the recommendation pool")
+        return recommendation_batch
+
+    def build_recommendation_batch(self, session):
+        self.lidify_logger.info(f"Searching for new artists via {self.mode}")
+        if self.mode == "Spotify":
+            client = self.provider_clients.spotify()
+            expand_seed = self.expand_spotify_seed
+        else:
+            client = self.provider_clients.lastfm()
+            expand_seed = self.expand_lastfm_seed
+
+        recommendation_batch = []
+        trace = session.trace
+        while not session.stop_event.is_set() and not self.provider_clients.quota(self.mode.lower()).is_paused():
+            seed_artists = session.seed_scheduler.next_seeds(7)
+            with metrics.span("expand", trace) as expand_span, concurrent.futures.ThreadPoolExecutor(max_workers=self.search_workers[self.mode], thread_name_prefix=f"{self.mode}_Seed") as executor:
+                pending = {executor.submit(self.run_seed_expansion, session, expand_seed, client, artist_name, trace, expand_span) for artist_name in seed_artists}
+                while pending:
+                    if session.stop_event.is_set():
+                        for future in pending:
+                            future.cancel()
+                        break
+                    done, pending = concurrent.futures.wait(pending, timeout=0.5, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            with metrics.span("dedupe", trace):
+                for related_artist in session.ranking_engine.top(self.recommendation_batch_size, lambda artist_name: self.is_known_artist(session, artist_name)):
+                    if session.stop_event.is_set():
+                        break
+                    if not self.claim_related_artist(session, related_artist["name"]):
                         continue
+                    if self.mode == "Spotify":
+                        exclusive_artist = self.spotify_recommendation(related_artist)
+                    else:
+                        exclusive_artist = self.lastfm_recommendation(related_artist)
+                    recommendation_batch.append((exclusive_artist, related_artist))
+                    self.schedule_frontier_seed(session, related_artist["name"])
+
+            if recommendation_batch or not seed_artists:
+                break
+
+        self.image_cache.flush_links()
+        return recommendation_batch
 
-                    random_related_artists = random.sample(related_artists, min(30, len(related_artists)))
-                    for related_artist in random_related_artists:
-                        if self.stop_event.is_set():
+    def publish_recommendation_batch(self, session, recommendation_batch, generation):
+        if generation != session.generation:
+            return
+        lfm = self.provider_clients.lastfm() if self.mode == "LastFM" else None
+        for exclusive_artist, related_artist in recommendation_batch:
+            if not self.publish_related_artist(session, exclusive_artist):
+                continue
+            if lfm and "genres" not in related_artist:
+                self.enrichment_executor.submit(self.enrich_lastfm_artist, session, lfm, related_artist, exclusive_artist)
+            if self.preview_prefetch:
+                self.preview_executor.submit(self.prefetch_preview, session, exclusive_artist.name, generation)
+        if recommendation_batch:
+            self.save_session(session)
+
+    def schedule_prefetch(self, session):
+        with session.prefetch_lock:
+            if session.stop_event.is_set() or len(session.prefetch_buffer) >= self.prefetch_batches:
+                return
+        self.job_scheduler.submit("prefetch", session.session_id, self.prefetch_worker, session, session.generation, cancel_event=session.stop_event)
+
+    def prefetch_worker(self, session, generation):
+        try:
+            while not session.stop_event.is_set() and generation == session.generation and len(session.prefetch_buffer) < self.prefetch_batches:
+                with session.search_lock:
+                    if len(session.prefetch_buffer) >= self.prefetch_batches:
+                        break
+                    recommendation_batch = self.take_pooled_batch(session) or self.build_recommendation_batch(session)
+                    if not recommendation_batch:
+                        break
+                    with session.prefetch_lock:
+                        if session.stop_event.is_set() or generation != session.generation:
+                            self.release_claims(session, recommendation_batch)
                             break
-                        cleaned_artist = unidecode(related_artist.item.name).lower()
-                        if cleaned_artist not in self.cleaned_lidarr_items:
-                            for item in self.recommended_artists:
-                                if related_artist.item.name == item["Name"]:
-                                    break
-                            else:
-                                artist_obj = lfm.get_artist(related_artist.item.name)
-                                genres = ", ".join([tag.item.get_name().title() for tag in artist_obj.get_top_tags()[:5]]) or "Unknown Genre"
-                                listeners = artist_obj.get_listener_count() or 0
-                                play_count = artist_obj.get_playcount() or 0
-                                try:
-                                    img_link = None
-                                    endpoint = "https://api.deezer.com/search/artist"
-                                    params = {"q": related_artist.item.name}
-                                    response = requests.get(endpoint, params=params)
-                                    data = response.json()
-                                    if "data" in data and data["data"]:
-                                        artist_info = data["data"][0]
-                                        img_link = artist_info.get("picture_xl", artist_info.get("picture_large", artist_info.get("picture_medium", artist_info.get("picture", ""))))
-
-                                except Exception as e:
-                                    self.lidify_logger.error(f"Deezer Error: {str(e)}")
-
-                                exclusive_artist = {
-                                    "Name": related_artist.item.name,
-                                    "Genre": genres,
-                                    "Status": "",
-                                    "Img_Link": img_link if img_link else "https://via.placeholder.com/300x200",
-                                    "Popularity": f"Play Count: {self.format_numbers(play_count)}",
-                                    "Followers": f"Listeners: {self.format_numbers(listeners)}",
-                                }
-                                self.recommended_artists.append(exclusive_artist)
-                                socketio.emit("more_artists_loaded", [exclusive_artist])
-                                self.new_found_artists_counter += 1
-
-                if self.new_found_artists_counter == 0:
-                    self.lidify_logger.info("Search Exhausted - Try selecting more artists from existing Lidarr library")
-                    socketio.emit("new_toast_msg", {"title": "Search Exhausted", "message": "Try selecting more artists from existing Lidarr library"})
+                        session.prefetch_buffer.append((generation, recommendation_batch))
+                        self.lidify_logger.info(f"Prefetched {len(recommendation_batch)} artists ({len(session.prefetch_buffer)} batches buffered)")
 
-            except Exception as e:
-                self.lidify_logger.error(f"LastFM Error: {str(e)}")
+        except Exception as e:
+            self.lidify_logger.error(f"Prefetch Error: {str(e)}")
+
+    def take_prefetched_batch(self, session, generation):
+        with session.prefetch_lock:
+            while session.prefetch_buffer:
+                batch_generation, recommendation_batch = session.prefetch_buffer.pop(0)
+                if batch_generation == generation:
+                    return recommendation_batch
+                self.release_claims(session, recommendation_batch)
+        return None
+
+    def clear_prefetch_buffer(self, session):
+        with session.prefetch_lock:
+            for batch_generation, recommendation_batch in session.prefetch_buffer:
+                self.release_claims(session, recommendation_batch)
+            session.prefetch_buffer = []
+
+    def release_claims(self, session, recommendation_batch):
+        with session.lock:
+            for exclusive_artist, related_artist in recommendation_batch:
+                session.claimed_artist_names.discard(normalize_artist_name(exclusive_artist.name))
+
+    def stop(self, session):
+        session.stop_event.set()
+        self.clear_prefetch_buffer(session)
+
+    def run_seed_expansion(self, session, expand_seed, client, artist_name, trace, parent_span):
+        if session.call_budget is not None and self.discovery_provider_calls() >= session.call_budget:
+            session.stop_event.set()
+            return
+        with metrics.span("seed", trace, artist_name, parent_span), ProviderQuota.cancelled_by(session.stop_event):
+            expand_seed(session, client, artist_name)
 
-            finally:
-                self.search_in_progress_flag = False
+    def expand_spotify_seed(self, session, sp, artist_name):
+        try:
+            if session.stop_event.is_set():
+                return
+            session.seed_scheduler.mark_expanded(artist_name)
+            related_artists = self.similarity_cache.get_related("Spotify", artist_name)
+            if related_artists is None:
+                search_id = None
+                results = sp.search(q=artist_name, type="artist")
+                items = results.get("artists", {}).get("items", [])
+                search_id = items[0]["id"]
+                related_artists = [
+                    {
+                        "name": related_artist["name"],
+                        "genres": related_artist.get("genres", []),
+                        "followers": related_artist.get("followers", {}).get("total", 0),
+                        "popularity": related_artist.get("popularity", "0"),
+                        "img_link": select_thumbnail_url(related_artist["images"]) if related_artist.get("images") else None,
+                    }
+                    for related_artist in sp.artist_related_artists(search_id)["artists"]
+                ]
+                self.similarity_cache.set_related("Spotify", artist_name, related_artists)
+            session.ranking_engine.add_seed(artist_name, related_artists)
+
+        except ProviderCancelledError:
+            session.seed_scheduler.mark_expanded(artist_name, False)
+
+        except ProviderUnavailableError as e:
+            session.seed_scheduler.mark_expanded(artist_name, False)
+            self.lidify_logger.warning(f"Spotify Paused on artist - '{artist_name}': {str(e)}")
 
-        elif self.new_found_artists_counter == 0:
-            try:
-                self.search_in_progress_flag = True
-                self.lidify_logger.info("Search Exhausted - Try selecting more artists from existing Lidarr library")
-                socketio.emit("new_toast_msg", {"title": "Search Exhausted", "message": "Try selecting more artists from existing Lidarr library"})
-                time.sleep(2)
+        except Exception as e:
+            self.lidify_logger.error(f"Spotify Error on artist - '{artist_name}': {str(e)}")
 
-            except Exception as e:
-                self.lidify_logger.error(f"Search Exhausted Error: {str(e)}")
+    def expand_lastfm_seed(self, session, lfm, artist_name):
+        try:
+            if session.stop_event.is_set():
+                return
+            session.seed_scheduler.mark_expanded(artist_name)
+            related_artists = self.similarity_cache.get_related("LastFM", artist_name)
+            if related_artists is None:
+                chosen_artist = lfm.get_artist(artist_name)
+                related_artists = [{"name": related_artist.item.name} for related_artist in self.provider_clients.call("lastfm", chosen_artist.get_similar)]
+                self.similarity_cache.set_related("LastFM", artist_name, related_artists)
+            session.ranking_engine.add_seed(artist_name, related_artists)
+
+        except ProviderCancelledError:
+            session.seed_scheduler.mark_expanded(artist_name, False)
+
+        except ProviderUnavailableError as e:
+            session.seed_scheduler.mark_expanded(artist_name, False)
+            self.lidify_logger.warning(f"LastFM Paused on artist - '{artist_name}': {str(e)}")
 
-            finally:
-                self.search_in_progress_flag = False
+        except Exception as e:
+            self.lidify_logger.error(f"Error with LastFM on artist - '{artist_name}': {str(e)}")
+
+    def schedule_frontier_seed(self, session, artist_name):
+        seed_keys = session.ranking_engine.sources_of(artist_name)
+        session.seed_scheduler.record_yield(seed_keys)
+        parent, depth = session.seed_scheduler.best_source(seed_keys)
+        if parent is not None:
+            session.seed_scheduler.add(artist_name, depth + 1, parent)
+
+    def is_known_artist(self, session, artist_name):
+        return normalize_artist_name(artist_name) in session.claimed_artist_names or artist_name in self.library_index or artist_name in session.recommendation_index
+
+    def spotify_recommendation(self, related_artist):
+        return Recommendation(
+            related_artist["name"],
+            genres=[genre.title() for genre in related_artist.get("genres") or []],
+            img_link=self.image_cache.thumbnail_link(related_artist["img_link"]) if related_artist.get("img_link") else None,
+            popularity=related_artist.get("popularity", 0),
+            followers=related_artist.get("followers", 0),
+        )
+
+    def lastfm_recommendation(self, related_artist):
+        if "genres" not in related_artist:
+            return Recommendation(related_artist["name"], img_link="https://via.placeholder.com/300x200")
+        return Recommendation(
+            related_artist["name"],
+            genres=related_artist["genres"],
+            img_link=self.image_cache.thumbnail_link(related_artist["img_link"]) if related_artist["img_link"] else "https://via.placeholder.com/300x200",
+            play_count=related_artist["play_count"],
+            listeners=related_artist["listeners"],
+        )
+
+    def enrich_lastfm_artist(self, session, lfm, related_artist, exclusive_artist):
+        if session.stop_event.is_set() or session.recommendation_index.get(exclusive_artist.name) is not exclusive_artist:
+            return
+        try:
+            with ProviderQuota.cancelled_by(session.stop_event):
+                self.fetch_lastfm_details(lfm, related_artist)
+            exclusive_artist.update(self.lastfm_recommendation(related_artist))
+            self.image_cache.flush_links()
+            socketio.emit("refresh_artist", exclusive_artist.card(), room=session.room)
 
-    def add_artists(self, raw_artist_name):
+        except Exception as e:
+            self.lidify_logger.error(f"LastFM Enrichment Error on artist - '{related_artist['name']}': {str(e)}")
+
+    def fetch_lastfm_details(self, lfm, related_artist):
+        with metrics.span("enrich"):
+            artist_obj = lfm.get_artist(related_artist["name"])
+            related_artist["genres"] = [tag.item.get_name().title() for tag in self.provider_clients.call("lastfm", artist_obj.get_top_tags)[:5]]
+            related_artist["listeners"] = self.provider_clients.call("lastfm", artist_obj.get_listener_count) or 0
+            related_artist["play_count"] = self.provider_clients.call("lastfm", artist_obj.get_playcount) or 0
+            found, related_artist["img_link"] = self.image_cache.get_url(related_artist["name"])
+            if not found:
+                try:
+                    endpoint = "https://api.deezer.com/search/artist"
+                    params = {"q": related_artist["name"]}
+                    response = self.provider_clients.session("deezer").get(endpoint, params=params)
+                    data = response.json()
+                    if "data" in data and data["data"]:
+                        artist_info = data["data"][0]
+                        related_artist["img_link"] = artist_info.get("picture_big", artist_info.get("picture_medium", artist_info.get("picture_xl", artist_info.get("picture", ""))))
+                    self.image_cache.set_url(related_artist["name"], related_artist["img_link"])
+
+                except Exception as e:
+                    self.lidify_logger.error(f"Deezer Error: {str(e)}")
+
+            self.similarity_cache.set_artist("LastFM", related_artist["name"], {k: v for k, v in related_artist.items() if k != "name"})
+
+    def claim_related_artist(self, session, artist_name):
+        with session.lock:
+            if self.is_known_artist(session, artist_name):
+                return False
+            session.claimed_artist_names.add(normalize_artist_name(artist_name))
+            return True
+
+    def publish_related_artist(self, session, exclusive_artist):
+        with session.lock:
+            if session.stop_event.is_set():
+                session.claimed_artist_names.discard(normalize_artist_name(exclusive_artist.name))
+                return False
+            session.recommended_artists.append(exclusive_artist)
+            session.recommendation_index.add(exclusive_artist)
+            session.new_found_artists_counter += 1
+            self.artist_emitter.queue(session.room, exclusive_artist)
+        return True
+
+    def add_artists(self, raw_artist_names):
         try:
-            artist_name = urllib.parse.unquote(raw_artist_name)
-            artist_folder = artist_name.replace("/", " ")
-            musicbrainzngs.set_useragent(self.app_name, self.app_rev, self.app_url)
-            mbid = self.get_mbid_from_musicbrainz(artist_name)
-            if mbid:
-                lidarr_url = f"{self.lidarr_address}/api/v1/artist"
-                headers = {"X-Api-Key": self.lidarr_api_key}
-                payload = {
-                    "ArtistName": artist_name,
-                    "qualityProfileId": self.quality_profile_id,
-                    "metadataProfileId": self.metadata_profile_id,
-                    "path": os.path.join(self.root_folder_path, artist_folder, ""),
-                    "rootFolderPath": self.root_folder_path,
-                    "foreignArtistId": mbid,
-                    "monitored": True,
-                    "addOptions": {"searchForMissingAlbums": self.search_for_missing_albums},
-                }
-                if self.dry_run_adding_to_lidarr:
-                    response = requests.Response()
-                    response.status_code = 201
-                else:
-                    response = requests.post(lidarr_url, headers=headers, json=payload)
+            if isinstance(raw_artist_names, str):
+                raw_artist_names = [raw_artist_names]
+            for raw_artist_name in raw_artist_names:
+                artist_name = urllib.parse.unquote(raw_artist_name)
+                cleaned_artist = normalize_artist_name(artist_name)
+                with self.add_queue_lock:
+                    if cleaned_artist in self.pending_additions:
+                        continue
+                    self.pending_additions.add(cleaned_artist)
+                self.set_artist_status(artist_name, "Queued")
+                if not self.job_scheduler.submit("musicbrainz", cleaned_artist, self.resolve_addition, artist_name):
+                    self.finish_addition(artist_name, "Failed to Add")
 
-                if response.status_code == 201:
-                    self.lidify_logger.info(f"Artist '{artist_name}' added successfully to Lidarr.")
-                    status = "Added"
-                    self.lidarr_items.append({"name": artist_name, "checked": False})
-                    self.cleaned_lidarr_items.append(unidecode(artist_name).lower())
-                else:
-                    self.lidify_logger.error(f"Failed to add artist '{artist_name}' to Lidarr.")
-                    error_data = json.loads(response.content)
-                    error_message = error_data[0].get("errorMessage", "No Error Message Returned") if error_data else "Error Unknown"
-                    self.lidify_logger.error(error_message)
-                    if "already been added" in error_message:
-                        status = "Already in Lidarr"
-                        self.lidify_logger.info(f"Artist '{artist_name}' is already in Lidarr.")
-                    elif "configured for an existing artist" in error_message:
-                        status = "Already in Lidarr"
-                        self.lidify_logger.info(f"'{artist_folder}' folder already configured for an existing artist.")
-                    elif "Invalid Path" in error_message:
-                        status = "Invalid Path"
-                        self.lidify_logger.info(f"Path: {os.path.join(self.root_folder_path, artist_folder, '')} not valid.")
-                    else:
-                        status = "Failed to Add"
+        except Exception as e:
+            self.lidify_logger.error(f"Adding Artist Error: {str(e)}")
 
-            else:
-                status = "Failed to Add"
+    def resolve_addition(self, artist_name):
+        try:
+            mbid = self.resolve_mbid(artist_name)
+            if mbid and self.job_scheduler.submit("lidarr_add", normalize_artist_name(artist_name), self.complete_addition, artist_name, mbid):
+                return
+            if not mbid:
                 self.lidify_logger.info(f"No Matching Artist for: '{artist_name}' in MusicBrainz.")
-                socketio.emit("new_toast_msg", {"title": "Failed to add Artist", "message": f"No Matching Artist for: '{artist_name}' in MusicBrainz."})
+                for session in self.sessions_with_artist(artist_name):
+                    socketio.emit("new_toast_msg", {"title": "Failed to add Artist", "message": f"No Matching Artist for: '{artist_name}' in MusicBrainz."}, room=session.room)
 
-            for item in self.recommended_artists:
-                if item["Name"] == artist_name:
-                    item["Status"] = status
-                    socketio.emit("refresh_artist", item)
-                    break
+        except Exception as e:
+            self.lidify_logger.error(f"MusicBrainz Error: {str(e)}")
+
+        self.finish_addition(artist_name, "Failed to Add")
 
+    def complete_addition(self, artist_name, mbid):
+        try:
+            status = self.add_artist_to_lidarr(artist_name, mbid)
         except Exception as e:
             self.lidify_logger.error(f"Adding Artist Error: {str(e)}")
+            status = "Failed to Add"
+        self.finish_addition(artist_name, status)
+
+    def add_artist_to_lidarr(self, artist_name, mbid):
+        artist_folder = artist_name.replace("/", " ")
+        lidarr_url = f"{self.lidarr_address}/api/v1/artist"
+        headers = {"X-Api-Key": self.lidarr_api_key}
+        payload = {
+            "ArtistName": artist_name,
+            "qualityProfileId": self.quality_profile_id,
+            "metadataProfileId": self.metadata_profile_id,
+            "path": os.path.join(self.root_folder_path, artist_folder, ""),
+            "rootFolderPath": self.root_folder_path,
+            "foreignArtistId": mbid,
+            "monitored": True,
+            "addOptions": {"searchForMissingAlbums": self.search_for_missing_albums},
+        }
+        if self.dry_run_adding_to_lidarr:
+            response = requests.Response()
+            response.status_code = 201
+        else:
+            response = self.provider_clients.session("lidarr").post(lidarr_url, headers=headers, json=payload)
+
+        if response.status_code == 201:
+            self.lidify_logger.info(f"Artist '{artist_name}' added successfully to Lidarr.")
+            status = "Added"
+            lidarr_item = LibraryArtist(artist_name)
+            bisect.insort(self.lidarr_items, lidarr_item, key=lambda item: item.name.lower())
+            self.library_index.add(lidarr_item)
+            self.library_version += 1
+            self.save_library_snapshot()
+        else:
+            self.lidify_logger.error(f"Failed to add artist '{artist_name}' to Lidarr.")
+            error_data = json.loads(response.content)
+            error_message = error_data[0].get("errorMessage", "No Error Message Returned") if error_data else "Error Unknown"
+            self.lidify_logger.error(error_message)
+            if "already been added" in error_message:
+                status = "Already in Lidarr"
+                self.lidify_logger.info(f"Artist '{artist_name}' is already in Lidarr.")
+            elif "configured for an existing artist" in error_message:
+                status = "Already in Lidarr"
+                self.lidify_logger.info(f"'{artist_folder}' folder already configured for an existing artist.")
+            elif "Invalid Path" in error_message:
+                status = "Invalid Path"
+                self.lidify_logger.info(f"Path: {os.path.join(self.root_folder_path, artist_folder, '')} not valid.")
+            else:
+                status = "Failed to Add"
+
+        return status
+
+    def finish_addition(self, artist_name, status):
+        with self.add_queue_lock:
+            self.pending_additions.discard(normalize_artist_name(artist_name))
+        self.set_artist_status(artist_name, status)
+
+    def set_artist_status(self, artist_name, status):
+        for session in self.sessions_with_artist(artist_name):
+            item = session.recommendation_index.get(artist_name)
+            item.status = status
+            socketio.emit("refresh_artist", item.card(), room=session.room)
+            self.session_saver.queue(session)
+
+    def sessions_with_artist(self, artist_name):
+        with self.sessions_lock:
+            return [session for session in self.sessions.values() if artist_name in session.recommendation_index]
+
+    def resolve_mbid(self, artist_name):
+        found, mbid = self.mbid_cache.get(artist_name)
+        if found:
+            return mbid
+        if self.musicbrainz_index:
+            mbids = self.musicbrainz_index.lookup(artist_name)
+            if len(mbids) == 1:
+                self.lidify_logger.info(f"Artist '{artist_name}' matched in local MusicBrainz index with MBID: {mbids[0]}")
+                self.mbid_cache.set(artist_name, mbids[0])
+                return mbids[0]
+        mbid = self.get_mbid_from_musicbrainz(artist_name)
+        self.mbid_cache.set(artist_name, mbid)
+        return mbid
 
     def get_mbid_from_musicbrainz(self, artist_name):
-        result = musicbrainzngs.search_artists(artist=artist_name)
+        result = self.provider_clients.call("musicbrainz", self.provider_clients.musicbrainz().search_artists, artist=artist_name)
         mbid = None
 
         if "artist-list" in result:
             artists = result["artist-list"]
-
-            for artist in artists:
-                match_ratio = fuzz.ratio(artist_name.lower(), artist["name"].lower())
-                decoded_match_ratio = fuzz.ratio(unidecode(artist_name.lower()), unidecode(artist["name"].lower()))
-                if match_ratio > 90 or decoded_match_ratio > 90:
-                    mbid = artist["id"]
-                    self.lidify_logger.info(f"Artist '{artist_name}' matched '{artist['name']}' with MBID: {mbid}  Match Ratio: {max(match_ratio, decoded_match_ratio)}")
-                    break
-            else:
-                if self.fallback_to_top_result and artists:
-                    mbid = artists[0]["id"]
-                    self.lidify_logger.info(f"Artist '{artist_name}' matched '{artists[0]['name']}' with MBID: {mbid}  Match Ratio: {max(match_ratio, decoded_match_ratio)}")
+            artist, match_ratio = best_match(artist_name, artists, self.match_threshold, lambda artist: [artist["name"]] + [alias["alias"] for alias in artist.get("alias-list", [])])
+            if artist:
+                mbid = artist["id"]
+                self.lidify_logger.info(f"Artist '{artist_name}' matched '{artist['name']}' with MBID: {mbid}  Match Ratio: {match_ratio:.0f}")
+            elif self.fallback_to_top_result and artists:
+                mbid = artists[0]["id"]
+                self.lidify_logger.info(f"Artist '{artist_name}' matched '{artists[0]['name']}' with MBID: {mbid}  Match Ratio: {match_ratio:.0f}")
 
         return mbid
 
     def load_settings(self):
         try:
+            self.refresh_shared_state()
             data = {
                 "lidarr_address": self.lidarr_address,
                 "lidarr_api_key": self.lidarr_api_key,
@@ -441,168 +2384,244 @@ class DataHandler:
 
     def update_settings(self, data):
         try:
-            self.lidarr_address = data["lidarr_address"]
-            self.lidarr_api_key = data["lidarr_api_key"]
-            self.root_folder_path = data["root_folder_path"]
-            self.spotify_client_id = data["spotify_client_id"]
-            self.spotify_client_secret = data["spotify_client_secret"]
+            for key in self.settings_form_keys:
+                setattr(self, key, data[key])
+            self.configure_provider_clients()
         except Exception as e:
             self.lidify_logger.error(f"Failed to update settings: {str(e)}")
 
-    def format_numbers(self, count):
-        if count >= 1000000:
-            return f"{count / 1000000:.1f}M"
-        elif count >= 1000:
-            return f"{count / 1000:.1f}K"
-        else:
-            return count
+    def configure_provider_clients(self):
+        self.provider_clients.configure(
+            spotify_client_id=self.spotify_client_id,
+            spotify_client_secret=self.spotify_client_secret,
+            last_fm_api_key=self.last_fm_api_key,
+            last_fm_api_secret=self.last_fm_api_secret,
+            app_name=self.app_name,
+            app_rev=self.app_rev,
+            app_url=self.app_url,
+        )
 
     def save_config_to_file(self):
         try:
+            settings = {
+                "lidarr_address": self.lidarr_address,
+                "lidarr_api_key": self.lidarr_api_key,
+                "root_folder_path": self.root_folder_path,
+                "spotify_client_id": self.spotify_client_id,
+                "spotify_client_secret": self.spotify_client_secret,
+                "fallback_to_top_result": self.fallback_to_top_result,
+                "match_threshold": self.match_threshold,
+                "lidarr_api_timeout": float(self.lidarr_api_timeout),
+                "quality_profile_id": self.quality_profile_id,
+                "metadata_profile_id": self.metadata_profile_id,
+                "search_for_missing_albums": self.search_for_missing_albums,
+                "dry_run_adding_to_lidarr": self.dry_run_adding_to_lidarr,
+                "app_name": self.app_name,
+                "app_rev": self.app_rev,
+                "app_url": self.app_url,
+                "last_fm_api_key": self.last_fm_api_key,
+                "last_fm_api_secret": self.last_fm_api_secret,
+                "mode": self.mode,
+                "auto_start": self.auto_start,
+                "auto_start_delay": self.auto_start_delay,
+                "spotify_cache_ttl_hours": self.spotify_cache_ttl_hours,
+                "lastfm_cache_ttl_hours": self.lastfm_cache_ttl_hours,
+                "similarity_cache_max_seeds": self.similarity_cache_max_seeds,
+                "image_cache_ttl_hours": self.image_cache_ttl_hours,
+                "thumbnail_cache_max_mb": self.thumbnail_cache_max_mb,
+                "seed_expansion_depth": self.seed_expansion_depth,
+                "seed_expansion_breadth": self.seed_expansion_breadth,
+                "prefetch_batches": self.prefetch_batches,
+                "preview_prefetch": self.preview_prefetch,
+                "enable_metrics": self.enable_metrics,
+                "trace_discovery": self.trace_discovery,
+                "discovery_interval_hours": self.discovery_interval_hours,
+                "discovery_call_budget": self.discovery_call_budget,
+                "recommendation_pool_ttl_hours": self.recommendation_pool_ttl_hours,
+                "recommendation_pool_max_entries": self.recommendation_pool_max_entries,
+            }
             with open(self.settings_config_file, "w") as json_file:
-                json.dump(
-                    {
-                        "lidarr_address": self.lidarr_address,
-                        "lidarr_api_key": self.lidarr_api_key,
-                        "root_folder_path": self.root_folder_path,
-                        "spotify_client_id": self.spotify_client_id,
-                        "spotify_client_secret": self.spotify_client_secret,
-                        "fallback_to_top_result": self.fallback_to_top_result,
-                        "lidarr_api_timeout": float(self.lidarr_api_timeout),
-                        "quality_profile_id": self.quality_profile_id,
-                        "metadata_profile_id": self.metadata_profile_id,
-                        "search_for_missing_albums": self.search_for_missing_albums,
-                        "dry_run_adding_to_lidarr": self.dry_run_adding_to_lidarr,
-                        "app_name": self.app_name,
-                        "app_rev": self.app_rev,
-                        "app_url": self.app_url,
-                        "last_fm_api_key": self.last_fm_api_key,
-                        "last_fm_api_secret": self.last_fm_api_secret,
-                        "mode": self.mode,
-                        "auto_start": self.auto_start,
-                        "auto_start_delay": self.auto_start_delay,
-                    },
-                    json_file,
-                    indent=4,
-                )
+                json.dump(settings, json_file, indent=4)
+            self.settings_store_version = self.state_store.set("settings", settings)
 
         except Exception as e:
             self.lidify_logger.error(f"Error Saving Config: {str(e)}")
 
-    def preview(self, raw_artist_name):
+    def preview(self, raw_artist_name, sid):
         artist_name = urllib.parse.unquote(raw_artist_name)
         if self.mode == "Spotify":
-            try:
-                preview_info = None
-                sp = spotipy.Spotify(retries=0, auth_manager=SpotifyClientCredentials(client_id=self.spotify_client_id, client_secret=self.spotify_client_secret))
-                results = sp.search(q=artist_name, type="artist")
-                items = results.get("artists", {}).get("items", [])
-                cleaned_artist_name = unidecode(artist_name).lower()
-                for item in items:
-                    match_ratio = fuzz.ratio(cleaned_artist_name, item.get("name", "").lower())
-                    decoded_match_ratio = fuzz.ratio(unidecode(cleaned_artist_name), unidecode(item.get("name", "").lower()))
-                    if match_ratio > 90 or decoded_match_ratio > 90:
-                        artist_id = item.get("id", "")
-                        top_tracks = sp.artist_top_tracks(artist_id)
-                        random.shuffle(top_tracks["tracks"])
-                        for track in top_tracks["tracks"]:
-                            if track.get("preview_url"):
-                                preview_info = {"artist": track["artists"][0]["name"], "song": track["name"], "preview_url": track["preview_url"]}
-                                break
-                        else:
-                            preview_info = f"No preview tracks available for artist: {artist_name}"
-                            self.lidify_logger.error(preview_info)
-                        break
-                else:
-                    preview_info = f"No Artist match for: {artist_name}"
-                    self.lidify_logger.error(preview_info)
-
-            except Exception as e:
-                preview_info = f"Error retrieving artist previews: {str(e)}"
-                self.lidify_logger.error(preview_info)
+            preview_info = self.get_spotify_preview(artist_name)
+            if isinstance(preview_info, list):
+                preview_info = random.choice(preview_info)
+            socketio.emit("spotify_preview", preview_info, room=sid)
 
-            finally:
-                socketio.emit("spotify_preview", preview_info, room=request.sid)
+        elif self.mode == "LastFM":
+            preview_info = self.get_lastfm_preview(artist_name)
+            socketio.emit("lastfm_preview", preview_info, room=sid)
 
+    def prefetch_preview(self, session, artist_name, generation):
+        if session.stop_event.is_set() or generation != session.generation:
+            return
+        if not self.provider_clients.quota(self.mode.lower()).has_spare_capacity():
+            return
+        found, preview_info = self.preview_cache.get(self.mode, artist_name)
+        if found:
+            return
+        if self.mode == "Spotify":
+            self.get_spotify_preview(artist_name)
         elif self.mode == "LastFM":
-            try:
-                preview_info = {}
-                biography = None
-                lfm = pylast.LastFMNetwork(api_key=self.last_fm_api_key, api_secret=self.last_fm_api_secret)
-                search_results = lfm.search_for_artist(artist_name)
-                artists = search_results.get_next_page()
-                cleaned_artist_name = unidecode(artist_name).lower()
-                for artist_obj in artists:
-                    match_ratio = fuzz.ratio(cleaned_artist_name, artist_obj.name.lower())
-                    decoded_match_ratio = fuzz.ratio(unidecode(cleaned_artist_name), unidecode(artist_obj.name.lower()))
-                    if match_ratio > 90 or decoded_match_ratio > 90:
-                        biography = artist_obj.get_bio_content()
-                        preview_info["artist_name"] = artist_obj.name
-                        preview_info["biography"] = biography
-                        break
-                else:
-                    preview_info = f"No Artist match for: {artist_name}"
-                    self.lidify_logger.error(preview_info)
+            self.get_lastfm_preview(artist_name)
 
-                if biography is None:
-                    preview_info = f"No Biography available for: {artist_name}"
+    def get_spotify_preview(self, artist_name):
+        found, preview_info = self.preview_cache.get("Spotify", artist_name)
+        if found:
+            return preview_info
+        try:
+            sp = self.provider_clients.spotify()
+            results = sp.search(q=artist_name, type="artist")
+            items = results.get("artists", {}).get("items", [])
+            item, match_ratio = best_match(artist_name, items, self.match_threshold, lambda item: [item.get("name", "")])
+            if item:
+                artist_id = item.get("id", "")
+                top_tracks = sp.artist_top_tracks(artist_id)
+                preview_info = [{"artist": track["artists"][0]["name"], "song": track["name"], "preview_url": track["preview_url"]} for track in top_tracks["tracks"] if track.get("preview_url")]
+                if not preview_info:
+                    preview_info = f"No preview tracks available for artist: {artist_name}"
                     self.lidify_logger.error(preview_info)
+            else:
+                preview_info = f"No Artist match for: {artist_name}"
+                self.lidify_logger.error(preview_info)
 
-            except Exception as e:
-                preview_info = {"error": f"Error retrieving artist bio: {str(e)}"}
+            self.preview_cache.set("Spotify", artist_name, preview_info)
+
+        except Exception as e:
+            preview_info = f"Error retrieving artist previews: {str(e)}"
+            self.lidify_logger.error(preview_info)
+
+        return preview_info
+
+    def get_lastfm_preview(self, artist_name):
+        found, preview_info = self.preview_cache.get("LastFM", artist_name)
+        if found:
+            return preview_info
+        try:
+            preview_info = {}
+            biography = None
+            lfm = self.provider_clients.lastfm()
+            search_results = lfm.search_for_artist(artist_name)
+            artists = self.provider_clients.call("lastfm", search_results.get_next_page)
+            artist_obj, match_ratio = best_match(artist_name, artists, self.match_threshold, lambda artist_obj: [artist_obj.name])
+            if artist_obj:
+                biography = self.provider_clients.call("lastfm", artist_obj.get_bio_content)
+                preview_info["artist_name"] = artist_obj.name
+                preview_info["biography"] = biography
+            else:
+                preview_info = f"No Artist match for: {artist_name}"
                 self.lidify_logger.error(preview_info)
 
-            finally:
-                socketio.emit("lastfm_preview", preview_info, room=request.sid)
+            if biography is None:
+                preview_info = f"No Biography available for: {artist_name}"
+                self.lidify_logger.error(preview_info)
+
+            self.preview_cache.set("LastFM", artist_name, preview_info)
+
+        except Exception as e:
+            preview_info = {"error": f"Error retrieving artist bio: {str(e)}"}
+            self.lidify_logger.error(preview_info)
+
+        return preview_info
 
 
+metrics = Metrics()
 app = Flask(__name__)
 app.secret_key = "secret_key"
-socketio = SocketIO(app)
+socketio = InstrumentedSocketIO(app, message_queue=os.environ.get("socketio_message_queue") or None)
 data_handler = DataHandler()
 
 
+@app.cli.command("build-musicbrainz-index")
+@click.argument("dump_path")
+def build_musicbrainz_index(dump_path):
+    artist_count, alias_count = MusicBrainzIndex.build(dump_path, data_handler.musicbrainz_index_folder)
+    data_handler.lidify_logger.info(f"Built MusicBrainz index with {artist_count} artists and {alias_count} aliases")
+
+
 @app.route("/")
 def home():
-    return render_template("base.html")
+    socketio_transports = ["websocket"] if os.environ.get("socketio_message_queue") else ["websocket", "polling"]
+    return render_template("base.html", socketio_transports=socketio_transports)
+
+
+@app.route("/jobs")
+def jobs():
+    return jsonify(data_handler.job_scheduler.depths())
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    if not metrics.enabled:
+        abort(404)
+    return metrics.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+@app.route("/thumbnail/<key>")
+def thumbnail(key):
+    source_url = data_handler.image_cache.source_url(key)
+    if source_url is None:
+        abort(404)
+    try:
+        thumbnail_path, content_type = data_handler.image_cache.fetch_thumbnail(key, source_url, data_handler.provider_clients.session("images"))
+    except Exception as e:
+        data_handler.lidify_logger.error(f"Thumbnail Error: {str(e)}")
+        return redirect(source_url)
+    response = send_file(thumbnail_path, mimetype=content_type, max_age=31536000)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
 
 
 @socketio.on("side_bar_opened")
 def side_bar_opened():
+    data_handler.refresh_shared_state()
     if data_handler.lidarr_items:
-        ret = {"Status": "Success", "Data": data_handler.lidarr_items, "Running": not data_handler.stop_event.is_set()}
-        socketio.emit("lidarr_sidebar_update", ret)
+        session = data_handler.session_for_sid(request.sid)
+        ret = {"Status": "Success", "Total": len(data_handler.lidarr_items), "Running": not session.stop_event.is_set()}
+        socketio.emit("lidarr_sidebar_update", ret, room=request.sid)
+
+
+@socketio.on("sidebar_page_req")
+def sidebar_page(data):
+    data_handler.sidebar_page(data_handler.session_for_sid(request.sid), data, request.sid)
+
+
+@socketio.on("sidebar_check")
+def sidebar_check(data):
+    data_handler.sidebar_check(data_handler.session_for_sid(request.sid), data)
 
 
 @socketio.on("get_lidarr_artists")
 def get_lidarr_artists():
-    thread = threading.Thread(target=data_handler.get_artists_from_lidarr, name="Lidarr_Thread")
-    thread.daemon = True
-    thread.start()
+    data_handler.job_scheduler.submit("lidarr", "get_artists", data_handler.get_artists_from_lidarr)
 
 
 @socketio.on("finder")
 def find_similar_artists(data):
-    thread = threading.Thread(target=data_handler.find_similar_artists, args=(data,), name="Find_Similar_Thread")
-    thread.daemon = True
-    thread.start()
+    session = data_handler.session_for_sid(request.sid)
+    data_handler.job_scheduler.submit("discovery", ("load_more", session.session_id), data_handler.find_similar_artists, session, cancel_event=session.stop_event, serial_key=session.session_id)
 
 
 @socketio.on("adder")
 def add_artists(data):
-    thread = threading.Thread(target=data_handler.add_artists, args=(data,), name="Add_Artists_Thread")
-    thread.daemon = True
-    thread.start()
+    data_handler.add_artists(data)
 
 
-@socketio.on("connect")
-def connection():
-    data_handler.connection()
+@socketio.on("sync_artists")
+def sync_artists(data):
+    data_handler.sync_artists(data, request.sid)
 
 
 @socketio.on("disconnect")
 def disconnection():
-    data_handler.disconnection()
+    data_handler.disconnection(request.sid)
 
 
 @socketio.on("load_settings")
@@ -618,24 +2637,24 @@ def update_settings(data):
 
 @socketio.on("start_req")
 def starter(data):
-    data_handler.start(data)
+    session = data_handler.session_for_sid(request.sid)
+    data_handler.job_scheduler.submit("discovery", ("start", session.session_id, json.dumps(data, sort_keys=True)), data_handler.start, session, data, serial_key=session.session_id)
 
 
 @socketio.on("stop_req")
 def stopper():
-    data_handler.stop_event.set()
+    data_handler.stop(data_handler.session_for_sid(request.sid))
 
 
 @socketio.on("load_more_artists")
 def load_more_artists():
-    thread = threading.Thread(target=data_handler.find_similar_artists, name="FindSimilar")
-    thread.daemon = True
-    thread.start()
+    session = data_handler.session_for_sid(request.sid)
+    data_handler.job_scheduler.submit("discovery", ("load_more", session.session_id), data_handler.find_similar_artists, session, cancel_event=session.stop_event, serial_key=session.session_id)
 
 
 @socketio.on("preview_req")
 def preview(artist):
-    data_handler.preview(artist)
+    data_handler.job_scheduler.submit("preview", (request.sid, artist), data_handler.preview, artist, request.sid)
 
 
 if __name__ == "__main__":
@@ -20,19 +20,38 @@ const root_folder_path = document.getElementById("root-folder-path");
 const spotify_client_id = document.getElementById("spotify-client-id");
 const spotify_client_secret = document.getElementById("spotify-client-secret");
 
-var lidarr_items = [];
-var socket = io();
+var lidarr_search = document.getElementById("lidarr-search");
+var lidarr_sidebar_body = lidarr_sidebar.querySelector('.offcanvas-body');
+
+const sidebar_page_size = 100;
+var sidebar_loaded_count = 0;
+var sidebar_total_count = 0;
+var sidebar_checked_count = 0;
+var sidebar_page_pending = false;
+var sidebar_running = false;
+var sidebar_search_timer = null;
+var artists_generation = null;
+var artists_received = 0;
+var discovery_session = sessionStorage.getItem("lidify_session");
+if (!discovery_session) {
+    discovery_session = Date.now().toString(36) + Math.random().toString(36).slice(2);
+    sessionStorage.setItem("lidify_session", discovery_session);
+}
+var socket = io({ transports: socketio_transports });
 
-function check_if_all_selected() {
-    var checkboxes = document.querySelectorAll('input[name="lidarr-item"]');
-    var all_checked = true;
-    for (var i = 0; i < checkboxes.length; i++) {
-        if (!checkboxes[i].checked) {
-            all_checked = false;
-            break;
-        }
+function request_sidebar_page(offset) {
+    sidebar_page_pending = true;
+    socket.emit("sidebar_page_req", { "offset": offset, "limit": sidebar_page_size, "query": lidarr_search.value });
+}
+
+function reload_sidebar() {
+    request_sidebar_page(0);
+}
+
+function load_next_sidebar_page(element) {
+    if (!sidebar_page_pending && sidebar_loaded_count < sidebar_total_count && element.scrollTop + element.clientHeight >= element.scrollHeight - 200) {
+        request_sidebar_page(sidebar_loaded_count);
     }
-    lidarr_select_all_checkbox.checked = all_checked;
 }
 
 function load_lidarr_data(response) {
@@ -56,7 +75,7 @@ function load_lidarr_data(response) {
         lidarr_select_all_checkbox.disabled = false;
         lidarr_get_artists_button.disabled = false;
     }
-    check_if_all_selected();
+    sidebar_running = response.Running;
 }
 
 function append_artists(artists) {
@@ -97,6 +116,10 @@ function append_artists(artists) {
             add_button.classList.add('btn-danger');
             add_button.disabled = true;
             add_button.textContent = artist.Status;
+        } else if (artist.Status === "Queued") {
+            artist_col.querySelector('.card-body').classList.add('status-blue');
+            add_button.disabled = true;
+            add_button.textContent = artist.Status;
         } else {
             artist_col.querySelector('.card-body').classList.add('status-blue');
         }
@@ -106,7 +129,7 @@ function append_artists(artists) {
 
 function add_to_lidarr(artist_name) {
     if (socket.connected) {
-        socket.emit('adder', encodeURIComponent(artist_name));
+        socket.emit('adder', [encodeURIComponent(artist_name)]);
     }
     else {
         show_toast("Connection Lost", "Please reload to continue.");
@@ -142,13 +165,27 @@ lidarr_select_all_checkbox.addEventListener("change", function () {
     checkboxes.forEach(function (checkbox) {
         checkbox.checked = is_checked;
     });
+    socket.emit("sidebar_check", { "all": true, "query": lidarr_search.value, "checked": is_checked });
+    reload_sidebar();
+});
+
+lidarr_search.addEventListener("input", function () {
+    clearTimeout(sidebar_search_timer);
+    sidebar_search_timer = setTimeout(reload_sidebar, 250);
+});
+
+lidarr_item_list.addEventListener("scroll", function () {
+    load_next_sidebar_page(lidarr_item_list);
+});
+
+lidarr_sidebar_body.addEventListener("scroll", function () {
+    load_next_sidebar_page(lidarr_sidebar_body);
 });
 
 lidarr_get_artists_button.addEventListener('click', function () {
     lidarr_get_artists_button.disabled = true;
     lidarr_spinner.classList.remove('d-none');
     lidarr_status.textContent = "Accessing Lidarr API";
-    lidarr_item_list.innerHTML = '';
     socket.emit("get_lidarr_artists");
 });
 
@@ -158,15 +195,13 @@ start_stop_button.addEventListener('click', function () {
         start_stop_button.classList.remove('btn-success');
         start_stop_button.classList.add('btn-warning');
         start_stop_button.textContent = "Stop";
-        var checked_items = Array.from(document.querySelectorAll('input[name="lidarr-item"]:checked'))
-            .map(item => item.value);
         document.querySelectorAll('input[name="lidarr-item"]').forEach(item => {
             item.disabled = true;
         });
         lidarr_get_artists_button.disabled = true;
         lidarr_select_all_checkbox.disabled = true;
-        socket.emit("start_req", checked_items);
-        if (checked_items.length > 0) {
+        socket.emit("start_req", { "selection": "checked" });
+        if (sidebar_checked_count > 0) {
             show_toast("Loading new artists");
         }
     }
@@ -234,44 +269,50 @@ window.addEventListener('touchend', () => {
     }
 });
 
-socket.on("lidarr_sidebar_update", (response) => {
-    if (response.Status == "Success") {
-        lidarr_status.textContent = "Lidarr List Retrieved";
-        lidarr_items = response.Data;
-        lidarr_item_list.innerHTML = '';
-        lidarr_select_all_container.classList.remove('d-none');
+function append_lidarr_items(items, offset) {
+    for (var i = 0; i < items.length; i++) {
+        var item = items[i];
 
-        for (var i = 0; i < lidarr_items.length; i++) {
-            var item = lidarr_items[i];
+        var div = document.createElement("div");
+        div.className = "form-check";
 
-            var div = document.createElement("div");
-            div.className = "form-check";
+        var input = document.createElement("input");
+        input.type = "checkbox";
+        input.className = "form-check-input";
+        input.id = "lidarr-" + (offset + i);
+        input.name = "lidarr-item";
+        input.value = item.name;
+        input.disabled = sidebar_running;
 
-            var input = document.createElement("input");
-            input.type = "checkbox";
-            input.className = "form-check-input";
-            input.id = "lidarr-" + i;
-            input.name = "lidarr-item";
-            input.value = item.name;
+        if (item.checked) {
+            input.checked = true;
+        }
 
-            if (item.checked) {
-                input.checked = true;
-            }
+        var label = document.createElement("label");
+        label.className = "form-check-label";
+        label.htmlFor = "lidarr-" + (offset + i);
+        label.textContent = item.name;
 
-            var label = document.createElement("label");
-            label.className = "form-check-label";
-            label.htmlFor = "lidarr-" + i;
-            label.textContent = item.name;
+        input.addEventListener("change", function () {
+            socket.emit("sidebar_check", { "name": this.value, "checked": this.checked });
+            sidebar_checked_count += this.checked ? 1 : -1;
+            if (!this.checked) {
+                lidarr_select_all_checkbox.checked = false;
+            }
+        });
 
-            input.addEventListener("change", function () {
-                check_if_all_selected();
-            });
+        div.appendChild(input);
+        div.appendChild(label);
 
-            div.appendChild(input);
-            div.appendChild(label);
+        lidarr_item_list.appendChild(div);
+    }
+}
 
-            lidarr_item_list.appendChild(div);
-        }
+socket.on("lidarr_sidebar_update", (response) => {
+    if (response.Status == "Success") {
+        lidarr_status.textContent = "Lidarr List Retrieved";
+        lidarr_select_all_container.classList.remove('d-none');
+        reload_sidebar();
     }
     else {
         lidarr_status.textContent = response.Code;
@@ -281,6 +322,25 @@ socket.on("lidarr_sidebar_update", (response) => {
     load_lidarr_data(response);
 });
 
+socket.on("sidebar_page", (page) => {
+    if (page.Query !== lidarr_search.value) {
+        return;
+    }
+    if (page.Offset === 0) {
+        lidarr_item_list.innerHTML = '';
+        sidebar_loaded_count = 0;
+    }
+    if (page.Offset === sidebar_loaded_count) {
+        append_lidarr_items(page.Items, page.Offset);
+        sidebar_loaded_count += page.Items.length;
+    }
+    sidebar_total_count = page.Total;
+    sidebar_checked_count = page.Checked;
+    sidebar_page_pending = false;
+    lidarr_select_all_checkbox.checked = page.AllChecked;
+    load_lidarr_data(page);
+});
+
 socket.on("refresh_artist", (artist) => {
     var artist_cards = document.querySelectorAll('#artist-column');
     artist_cards.forEach(function (card) {
@@ -288,6 +348,14 @@ socket.on("refresh_artist", (artist) => {
         var card_artist_name = card_body.querySelector('.card-title').textContent.trim();
 
         if (card_artist_name === artist.Name) {
+            card_body.querySelector('.genre').textContent = artist.Genre;
+            card_body.querySelector('.followers').textContent = artist.Followers;
+            card_body.querySelector('.popularity').textContent = artist.Popularity;
+            var card_img = card_body.querySelector('.card-img-top');
+            if (card_img && artist.Img_Link && card_img.getAttribute('src') !== artist.Img_Link) {
+                card_img.src = artist.Img_Link;
+                card_img.alt = artist.Name;
+            }
             card_body.classList.remove('status-green', 'status-red', 'status-blue');
 
             var add_button = card_body.querySelector('.add-to-lidarr-btn');
@@ -304,6 +372,10 @@ socket.on("refresh_artist", (artist) => {
                 add_button.classList.add('btn-danger');
                 add_button.disabled = true;
                 add_button.textContent = artist.Status;
+            } else if (artist.Status === "Queued") {
+                card_body.classList.add('status-blue');
+                add_button.disabled = true;
+                add_button.textContent = artist.Status;
             } else {
                 card_body.classList.add('status-blue');
                 add_button.disabled = false;
@@ -313,11 +385,18 @@ socket.on("refresh_artist", (artist) => {
     });
 });
 
+socket.on('connect', function () {
+    socket.emit('sync_artists', { "session": discovery_session, "generation": artists_generation, "received": artists_received });
+});
+
 socket.on('more_artists_loaded', function (data) {
+    artists_received += data.length;
     append_artists(data);
 });
 
-socket.on('clear', function () {
+socket.on('clear', function (data) {
+    artists_generation = data.generation;
+    artists_received = 0;
     clear_all();
 });
 
@@ -327,7 +406,6 @@ socket.on("new_toast_msg", function (data) {
 
 socket.on("disconnect", function () {
     show_toast("Connection Lost", "Please reconnect to continue.");
-    clear_all();
 });
 
 function clear_all() {
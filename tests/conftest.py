@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+SOURCE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+@pytest.fixture(scope="session")
+def lidify(tmp_path_factory):
+    for key in ("lidarr_api_key", "state_backend_url", "socketio_message_queue", "auto_start", "discovery_interval_hours"):
+        os.environ.pop(key, None)
+    working_directory = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("lidify"))
+    sys.path.insert(0, SOURCE_FOLDER)
+    try:
+        import Lidify
+    finally:
+        os.chdir(working_directory)
+    return Lidify
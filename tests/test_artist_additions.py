@@ -0,0 +1,91 @@
+import time
+import urllib.parse
+
+import pytest
+
+
+@pytest.fixture
+def data_handler(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    statuses = []
+    monkeypatch.setattr(lidify.socketio, "emit", lambda event, data=None, **kwargs: statuses.append((data["Name"], data["Status"])) if event == "refresh_artist" else None)
+    data_handler = lidify.DataHandler()
+    data_handler.dry_run_adding_to_lidarr = True
+    data_handler.statuses = statuses
+    data_handler.lookups = []
+
+    def get_mbid_from_musicbrainz(artist_name):
+        data_handler.lookups.append(artist_name)
+        time.sleep(0.1)
+        return None if artist_name == "Unknown Artist" else f"mbid-{artist_name}"
+
+    monkeypatch.setattr(data_handler, "get_mbid_from_musicbrainz", get_mbid_from_musicbrainz)
+    return data_handler
+
+
+def recommend(lidify, data_handler, *names):
+    session = data_handler.get_session("tab")
+    for name in names:
+        session.recommendation_index.add(lidify.Recommendation(name))
+
+
+def statuses_of(data_handler, name, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        statuses = [status for artist_name, status in data_handler.statuses if artist_name == name]
+        if statuses and statuses[-1] != "Queued":
+            return statuses
+        time.sleep(0.01)
+    raise AssertionError(f"No final status for {name}: {data_handler.statuses}")
+
+
+def test_artist_is_queued_then_added(lidify, data_handler):
+    recommend(lidify, data_handler, "Sigur Rós")
+
+    data_handler.add_artists([urllib.parse.quote("Sigur Rós")])
+
+    assert statuses_of(data_handler, "Sigur Rós") == ["Queued", "Added"]
+    assert data_handler.lookups == ["Sigur Rós"]
+
+
+def test_single_name_is_accepted(lidify, data_handler):
+    recommend(lidify, data_handler, "Tricky")
+
+    data_handler.add_artists("Tricky")
+
+    assert statuses_of(data_handler, "Tricky") == ["Queued", "Added"]
+
+
+def test_pending_duplicates_are_dropped(lidify, data_handler):
+    recommend(lidify, data_handler, "Portishead")
+
+    data_handler.add_artists(["Portishead", "portishead"])
+    data_handler.add_artists(["Portishead"])
+
+    assert statuses_of(data_handler, "Portishead") == ["Queued", "Added"]
+    assert data_handler.lookups == ["Portishead"]
+
+
+def test_resolved_and_missing_mbids_are_cached(lidify, data_handler):
+    recommend(lidify, data_handler, "Portishead", "Unknown Artist")
+    data_handler.add_artists(["Portishead", "Unknown Artist"])
+    assert statuses_of(data_handler, "Portishead") == ["Queued", "Added"]
+    assert statuses_of(data_handler, "Unknown Artist") == ["Queued", "Failed to Add"]
+    data_handler.statuses.clear()
+
+    data_handler.add_artists(["Portishead", "Unknown Artist"])
+
+    assert statuses_of(data_handler, "Portishead") == ["Queued", "Added"]
+    assert statuses_of(data_handler, "Unknown Artist") == ["Queued", "Failed to Add"]
+    assert sorted(data_handler.lookups) == ["Portishead", "Unknown Artist"]
+
+
+def test_artists_queue_in_order_behind_one_lookup_worker(lidify, data_handler):
+    names = ["Massive Attack", "Portishead", "Tricky"]
+    recommend(lidify, data_handler, *names)
+
+    data_handler.add_artists(names)
+
+    for name in names:
+        assert statuses_of(data_handler, name) == ["Queued", "Added"]
+    assert data_handler.lookups == names
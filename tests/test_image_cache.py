@@ -0,0 +1,155 @@
+import os
+import time
+
+import pytest
+
+
+class StubImageSession:
+    def __init__(self, size):
+        self.size = size
+        self.urls = []
+
+    def get(self, url, timeout=None, stream=False):
+        self.urls.append(url)
+        return self
+
+    def __enter__(self):
+        self.headers = {"Content-Type": "image/jpeg"}
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield b"x" * self.size
+
+
+@pytest.fixture
+def image_cache(lidify, tmp_path):
+    def build(ttl_hours=720, max_folder_bytes=10000):
+        return lidify.ImageCache(str(tmp_path / "image_cache.db"), str(tmp_path / "thumbnails"), negative_ttl_hours=24, ttl_hours=ttl_hours, max_folder_bytes=max_folder_bytes)
+
+    return build
+
+
+@pytest.fixture
+def data_handler(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(lidify.socketio, "emit", lambda event, data=None, room=None: None)
+    data_handler = lidify.DataHandler()
+    data_handler.mode = "LastFM"
+    monkeypatch.setattr(data_handler, "get_artists_from_lidarr", lambda: None)
+    monkeypatch.setattr(data_handler, "fetch_lastfm_details", lambda lfm, related_artist: related_artist.update({"genres": ["Trip Hop"], "img_link": f"https://images.example/{related_artist['name']}.jpg", "play_count": 1, "listeners": 1}))
+    return data_handler
+
+
+def other_worker_cache(lidify, tmp_path):
+    return lidify.ImageCache(str(tmp_path / "config" / "image_cache.db"), str(tmp_path / "config" / "thumbnails"), negative_ttl_hours=24, ttl_hours=720, max_folder_bytes=10000)
+
+
+def thumbnail_key(recommendation):
+    return recommendation.img_link.split("/")[1]
+
+
+def thumbnail_rows(cache):
+    return cache.connection.execute("SELECT COUNT(*) FROM thumbnails").fetchone()[0]
+
+
+def test_thumbnail_links_are_written_in_one_batch(image_cache):
+    cache = image_cache()
+    links = [cache.thumbnail_link(f"https://images.example/{index}.jpg") for index in range(20)]
+
+    assert thumbnail_rows(cache) == 0
+    cache.flush_links()
+    assert thumbnail_rows(cache) == 20
+    assert cache.source_url(links[3].split("/")[1]) == "https://images.example/3.jpg"
+
+
+def test_source_url_flushes_pending_links(image_cache):
+    cache = image_cache()
+    key = cache.thumbnail_link("https://images.example/a.jpg").split("/")[1]
+
+    assert cache.source_url(key) == "https://images.example/a.jpg"
+
+
+def test_unused_thumbnails_expire(image_cache):
+    cache = image_cache(ttl_hours=1)
+    key = cache.thumbnail_link("https://images.example/a.jpg").split("/")[1]
+    thumbnail_path, _ = cache.fetch_thumbnail(key, cache.source_url(key), StubImageSession(100))
+    cache.set_url("Radiohead", "https://images.example/radiohead.jpg")
+    with cache.connection:
+        cache.connection.execute("UPDATE thumbnails SET last_used = ?", (time.time() - 7200,))
+        cache.connection.execute("UPDATE images SET resolved_at = ?", (time.time() - 7200,))
+
+    cache.evict()
+
+    assert cache.source_url(key) is None
+    assert not os.path.exists(thumbnail_path)
+    assert cache.get_url("Radiohead") == (False, None)
+
+
+def test_folder_size_bound_evicts_least_recently_used(image_cache):
+    cache = image_cache(max_folder_bytes=250)
+    session = StubImageSession(100)
+    paths = []
+    for index in range(3):
+        key = cache.thumbnail_link(f"https://images.example/{index}.jpg").split("/")[1]
+        paths.append(cache.fetch_thumbnail(key, cache.source_url(key), session)[0])
+        with cache.connection:
+            cache.connection.execute("UPDATE thumbnails SET last_used = ? WHERE key = ?", (time.time() - 100 + index, key))
+
+    cache.evict()
+
+    assert [os.path.exists(path) for path in paths] == [False, True, True]
+    refetched_path, _ = cache.fetch_thumbnail(os.path.basename(paths[0]), "https://images.example/0.jpg", session)
+    assert os.path.exists(refetched_path)
+    assert len(session.urls) == 4
+
+
+def test_eviction_runs_on_open(image_cache):
+    cache = image_cache()
+    key = cache.thumbnail_link("https://images.example/a.jpg").split("/")[1]
+    thumbnail_path, _ = cache.fetch_thumbnail(key, cache.source_url(key), StubImageSession(100))
+    cache.connection.close()
+
+    image_cache(max_folder_bytes=50)
+
+    assert not os.path.exists(thumbnail_path)
+
+
+def test_enriched_lastfm_thumbnail_resolves_on_another_worker(lidify, data_handler, tmp_path):
+    session = data_handler.get_session("tab")
+    session.stop_event.clear()
+    related_artist = {"name": "Portishead"}
+    exclusive_artist = data_handler.lastfm_recommendation(related_artist)
+    data_handler.publish_related_artist(session, exclusive_artist)
+
+    data_handler.enrich_lastfm_artist(session, None, related_artist, exclusive_artist)
+
+    assert other_worker_cache(lidify, tmp_path).source_url(thumbnail_key(exclusive_artist)) == "https://images.example/Portishead.jpg"
+
+
+def test_pooled_thumbnails_resolve_on_another_worker(lidify, data_handler, tmp_path, monkeypatch):
+    related_artist = {"name": "Tricky"}
+    monkeypatch.setattr(data_handler, "build_recommendation_batch", lambda session: [(data_handler.lastfm_recommendation(related_artist), related_artist)])
+    monkeypatch.setattr(data_handler, "discovery_provider_calls", lambda: 0 if related_artist.get("genres") is None else data_handler.discovery_call_budget)
+
+    data_handler.run_scheduled_discovery()
+
+    recommendation, _ = data_handler.recommendation_pool.entries("LastFM", ["Tricky"])["Tricky"]
+    assert other_worker_cache(lidify, tmp_path).source_url(thumbnail_key(recommendation)) == "https://images.example/Tricky.jpg"
+
+
+def test_pool_served_cards_survive_thumbnail_eviction(lidify, data_handler, tmp_path):
+    related_artist = {"name": "Tricky", "genres": ["Trip Hop"], "img_link": "https://images.example/Tricky.jpg", "play_count": 1, "listeners": 1}
+    data_handler.recommendation_pool.add("LastFM", [("Tricky", ["massive attack"], 1.0, data_handler.lastfm_recommendation(related_artist), related_artist)])
+    with data_handler.image_cache.connection:
+        data_handler.image_cache.connection.execute("DELETE FROM thumbnails")
+    session = data_handler.get_session("tab")
+
+    (recommendation, _), = data_handler.take_pooled_batch(session, any_roots=True)
+
+    assert other_worker_cache(lidify, tmp_path).source_url(thumbnail_key(recommendation)) == "https://images.example/Tricky.jpg"
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def data_handler(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(lidify.socketio, "emit", lambda event, data=None, room=None: None)
+    return lidify.DataHandler()
+
+
+def chunked(text, size):
+    return [text[start : start + size] for start in range(0, len(text), size)]
+
+
+def library(data_handler):
+    return [(item.artist_id, item.name) for item in data_handler.lidarr_items]
+
+
+ARTISTS = [{"id": 1, "artistName": "Radiohead", "extra": {"links": ["a", "b]"]}}, {"id": 2, "artistName": "Björk"}, {"id": 3, "artistName": "Portishead"}]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 65536])
+def test_json_array_is_parsed_across_chunk_boundaries(data_handler, chunk_size):
+    text = " [\n" + ",\n  ".join(json.dumps(artist) for artist in ARTISTS) + "\n]\n"
+
+    assert list(data_handler.iter_json_array(chunked(text, chunk_size))) == ARTISTS
+
+
+def test_empty_json_array_yields_nothing(data_handler):
+    assert list(data_handler.iter_json_array(["[", " ]"])) == []
+
+
+def test_library_changes_add_remove_and_rename_by_id(data_handler):
+    data_handler.apply_library_changes({1: "Radiohead", 2: "Bjork", 3: "Portishead"})
+
+    added, removed = data_handler.apply_library_changes({1: "Radiohead", 2: "Bjork (Iceland)", 4: "Tricky"})
+
+    assert sorted(item.name for item in added) == ["Bjork (Iceland)", "Tricky"]
+    assert sorted(item.name for item in removed) == ["Bjork", "Portishead"]
+    assert library(data_handler) == [(2, "Bjork (Iceland)"), (1, "Radiohead"), (4, "Tricky")]
+    assert "portishead" not in data_handler.library_index
+    assert "tricky" in data_handler.library_index
+
+
+def test_unchanged_library_is_not_rebuilt(data_handler):
+    data_handler.apply_library_changes({1: "Radiohead"})
+    library_version = data_handler.library_version
+
+    assert data_handler.apply_library_changes({1: "Radiohead"}) == ([], [])
+    assert data_handler.library_version == library_version
+
+
+def test_artists_added_by_lidify_adopt_their_lidarr_id(data_handler, lidify):
+    data_handler.lidarr_items = [lidify.LibraryArtist("Massive Attack")]
+
+    assert data_handler.apply_library_changes({7: "Massive Attack"}) == ([], [])
+    assert library(data_handler) == [(7, "Massive Attack")]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "<html><body>502 Bad Gateway</body></html>",
+        '[{"id": 1, "artistName": "Radiohead"}, {"id": 2, "artistName": "Bj',
+        '[{"id": 1, "artistName": "Radiohead"}',
+        '[{"id": 1, "artistName": "Radiohead"},',
+        '[{"id": 1, "artistName": "Radiohead"}] <!-- proxy -->',
+        '[{"id": 1, "artistName": "Radiohead"} {"id": 2, "artistName": "Portishead"}]',
+        "",
+    ],
+)
+def test_malformed_json_array_raises(data_handler, text):
+    with pytest.raises(ValueError):
+        list(data_handler.iter_json_array(chunked(text, 16)))
+
+
+class StubLidarrResponse:
+    status_code = 200
+    encoding = None
+
+    def __init__(self, text):
+        self.text = text
+
+    def iter_content(self, chunk_size, decode_unicode=False):
+        return chunked(self.text, 16)
+
+
+def serve_library(data_handler, monkeypatch, text):
+    session = data_handler.provider_clients.session("lidarr")
+    monkeypatch.setattr(session, "get", lambda *args, **kwargs: StubLidarrResponse(text))
+    data_handler.get_artists_from_lidarr()
+
+
+def test_bad_lidarr_response_keeps_the_previous_library(data_handler, monkeypatch):
+    serve_library(data_handler, monkeypatch, json.dumps(ARTISTS))
+    assert len(data_handler.lidarr_items) == 3
+    store_version = data_handler.state_store.version("library")
+
+    serve_library(data_handler, monkeypatch, json.dumps(ARTISTS)[:60])
+
+    assert len(data_handler.lidarr_items) == 3
+    assert data_handler.state_store.version("library") == store_version
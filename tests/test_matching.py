@@ -0,0 +1,47 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "name, key",
+    [
+        ("  Björk ", "bjork"),
+        ("Sigur Rós", "sigur ros"),
+        ("Simon & Garfunkel", "simon and garfunkel"),
+        ("AC/DC", "ac dc"),
+        ("The Beatles", "beatles"),
+        ("The The", "the"),
+        ("The", "the"),
+        ("!!!", "!!!"),
+    ],
+)
+def test_artist_names_share_one_normalized_key(lidify, name, key):
+    assert lidify.normalize_artist_name(name) == key
+
+
+def test_library_index_and_claims_use_the_same_key(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_handler = lidify.DataHandler()
+    data_handler.lidarr_items = [lidify.LibraryArtist("The Beatles")]
+    data_handler.library_index.rebuild(data_handler.lidarr_items)
+    session = data_handler.get_session("tab")
+
+    assert not data_handler.claim_related_artist(session, "Beatles")
+    assert data_handler.claim_related_artist(session, "Simon & Garfunkel")
+    assert not data_handler.claim_related_artist(session, "Simon and Garfunkel")
+
+
+def test_best_match_picks_the_closest_name_or_alias(lidify):
+    candidates = [{"name": "Radiohead Tribute", "aliases": []}, {"name": "Guðmundsdóttir", "aliases": ["Björk"]}]
+
+    match, score = lidify.best_match("Bjork", candidates, 90, lambda candidate: [candidate["name"]] + candidate["aliases"])
+
+    assert match is candidates[1]
+    assert score == 100
+
+
+def test_best_match_requires_a_score_above_the_threshold(lidify):
+    match, score = lidify.best_match("radiohead1", ["radiohead2"], 90)
+
+    assert score == 90
+    assert match is None
+    assert lidify.best_match("radiohead1", ["radiohead2"], 89)[0] == "radiohead2"
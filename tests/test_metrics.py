@@ -0,0 +1,12 @@
+def test_large_counters_and_sums_keep_every_digit(lidify):
+    metrics = lidify.Metrics()
+    metrics.inc("lidify_socket_emit_bytes_total", 1234567, event="more_artists_loaded")
+    metrics.inc("lidify_socket_emit_bytes_total", 1, event="more_artists_loaded")
+    metrics.observe("lidify_provider_request_seconds", 1234567.125, provider="spotify")
+    metrics.register_gauge("lidify_threads", lambda: [({"pool": "Discovery"}, 4)])
+
+    lines = metrics.render().splitlines()
+
+    assert 'lidify_socket_emit_bytes_total{event="more_artists_loaded"} 1234568.0' in lines
+    assert 'lidify_provider_request_seconds_sum{provider="spotify"} 1234567.125' in lines
+    assert 'lidify_threads{pool="Discovery"} 4' in lines
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+FIXTURE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "musicbrainz")
+RADIOHEAD = "a74b1b7f-71a5-4011-9441-d0b5e4122711"
+BJORK = "87c5dedd-371d-4a53-9f7f-80522fb7f3cb"
+NIRVANA = ["5b11f4ce-a62d-471e-81fc-a69a8278c7da", "9282c8b4-ca0b-4c6b-b7e3-4f7762dfc4d6"]
+SMILE = "e5f6e1d6-7a5b-4a49-b5b8-3e1f0d3a5f43"
+
+
+@pytest.fixture(params=["artist.json", "tsv"])
+def index(lidify, tmp_path, request):
+    counts = lidify.MusicBrainzIndex.build(os.path.join(FIXTURE_FOLDER, request.param), str(tmp_path))
+    assert counts == (7, 4)
+    return lidify.MusicBrainzIndex(str(tmp_path))
+
+
+def test_lookup_by_name(index):
+    assert index.lookup("Radiohead") == [RADIOHEAD]
+
+
+def test_lookup_ignores_case_diacritics_and_spacing(index):
+    assert index.lookup("  bjork ") == [BJORK]
+    assert index.lookup("SIGUR RÓS") == index.lookup("sigur ros")
+
+
+def test_lookup_by_alias(index):
+    assert index.lookup("On a Friday") == [RADIOHEAD]
+    assert index.lookup("Bjork Gudmundsdottir") == [BJORK]
+
+
+def test_artist_name_takes_precedence_over_alias(index):
+    assert index.lookup("Smile") == [SMILE]
+
+
+def test_ambiguous_name_returns_every_mbid(index):
+    assert sorted(index.lookup("Nirvana")) == NIRVANA
+
+
+def test_unknown_name(index):
+    assert index.lookup("Velvet Harbor") == []
+    assert index.lookup("") == []
+
+
+def test_empty_alias_table(lidify, tmp_path):
+    assert lidify.MusicBrainzIndex.build(os.path.join(FIXTURE_FOLDER, "tsv_without_aliases"), str(tmp_path)) == (7, 0)
+    assert os.path.getsize(tmp_path / "aliases.tsv") == 0
+
+    index = lidify.MusicBrainzIndex(str(tmp_path))
+    assert index.lookup("Radiohead") == [RADIOHEAD]
+    assert index.lookup("On a Friday") == []
+
+
+def test_resolve_mbid_falls_back_to_web_service_only_when_needed(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    lidify.MusicBrainzIndex.build(os.path.join(FIXTURE_FOLDER, "tsv"), str(tmp_path / "config" / "musicbrainz_index"))
+    data_handler = lidify.DataHandler()
+    assert data_handler.musicbrainz_index is not None
+    web_lookups = []
+    monkeypatch.setattr(data_handler, "get_mbid_from_musicbrainz", lambda artist_name: web_lookups.append(artist_name) or NIRVANA[0])
+
+    assert data_handler.resolve_mbid("On a Friday") == RADIOHEAD
+    assert data_handler.resolve_mbid("Nirvana") == NIRVANA[0]
+    assert data_handler.resolve_mbid("Velvet Harbor") == NIRVANA[0]
+    assert web_lookups == ["Nirvana", "Velvet Harbor"]
@@ -0,0 +1,208 @@
+import http.server
+import threading
+import time
+import urllib.error
+
+import pytest
+import requests
+
+
+class ScriptedServer:
+    def __init__(self):
+        self.responses = []
+        self.methods = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self)
+
+            def do_POST(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def script(self, *responses):
+        self.responses.extend(responses)
+
+    def handle(self, handler):
+        handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+        with self.lock:
+            self.methods.append(handler.command)
+            status, headers, delay = self.responses.pop(0) if self.responses else (200, {}, 0)
+        time.sleep(delay)
+        handler.send_response(status)
+        handler.send_header("Content-Length", "2")
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(b"{}")
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def server():
+    scripted_server = ScriptedServer()
+    yield scripted_server
+    scripted_server.close()
+
+
+def limited_session(lidify, **quota_options):
+    quota = lidify.ProviderQuota("stub", **dict({"rate": 100, "burst": 100, "backoff_seconds": 0.05}, **quota_options))
+    session = requests.Session()
+    session.mount("http://", lidify.RateLimitedAdapter(quota))
+    return quota, session
+
+
+def test_429_waits_for_retry_after(lidify, server):
+    server.script((429, {"Retry-After": "0.3"}, 0))
+    quota, session = limited_session(lidify)
+
+    started = time.monotonic()
+    response = session.get(server.url)
+
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 0.3
+    assert server.methods == ["GET", "GET"]
+    assert quota.failures == 0
+
+
+def test_server_errors_back_off_exponentially(lidify, server):
+    server.script((503, {}, 0), (503, {}, 0))
+    quota, session = limited_session(lidify)
+
+    started = time.monotonic()
+    response = session.get(server.url)
+
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 0.05 * 0.5 + 0.1 * 0.5
+    assert len(server.methods) == 3
+
+
+def test_last_response_is_returned_after_max_retries(lidify, server):
+    server.script(*[(503, {}, 0)] * 3)
+    quota, session = limited_session(lidify, max_retries=2, backoff_seconds=0.01)
+
+    assert session.get(server.url).status_code == 503
+    assert len(server.methods) == 3
+
+
+def test_post_is_not_retried_after_server_error_or_timeout(lidify, server):
+    server.script((503, {}, 0), (200, {}, 0.5))
+    quota, session = limited_session(lidify)
+
+    assert session.post(server.url, json={}).status_code == 503
+    with pytest.raises(requests.exceptions.Timeout):
+        session.post(server.url, json={}, timeout=0.2)
+    assert server.methods == ["POST", "POST"]
+
+
+def test_post_is_retried_after_429(lidify, server):
+    server.script((429, {"Retry-After": "0.1"}, 0))
+    quota, session = limited_session(lidify)
+
+    assert session.post(server.url, json={}).status_code == 200
+    assert server.methods == ["POST", "POST"]
+
+
+def test_breaker_opens_after_repeated_failures_and_resets(lidify, server):
+    server.script((503, {}, 0), (503, {}, 0), (503, {}, 0))
+    quota, session = limited_session(lidify, max_retries=0, failure_threshold=2, cooldown_seconds=0.3, backoff_seconds=0.01)
+
+    assert session.get(server.url).status_code == 503
+    time.sleep(0.03)
+    assert session.get(server.url).status_code == 503
+    assert quota.is_paused()
+    with pytest.raises(lidify.ProviderUnavailableError):
+        session.get(server.url)
+    assert len(server.methods) == 2
+
+    time.sleep(0.3)
+    assert session.get(server.url).status_code == 503
+    assert quota.is_paused()
+
+    time.sleep(0.3)
+    assert session.get(server.url).status_code == 200
+    assert quota.failures == 0
+    assert not quota.is_paused()
+
+
+def test_long_retry_after_pauses_provider(lidify, server):
+    server.script((429, {"Retry-After": "120"}, 0))
+    quota, session = limited_session(lidify, cooldown_seconds=60)
+
+    with pytest.raises(lidify.ProviderUnavailableError):
+        session.get(server.url)
+    assert quota.paused_until - time.monotonic() > 100
+
+
+def test_call_retries_musicbrainz_rate_limit_with_retry_after(lidify):
+    musicbrainzngs = pytest.importorskip("musicbrainzngs")
+    quota = lidify.ProviderQuota("musicbrainz", rate=100, burst=100)
+    attempts = []
+
+    def search():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise musicbrainzngs.ResponseError(cause=urllib.error.HTTPError("http://musicbrainz.org", 429, "Too Many Requests", {"Retry-After": "0.2"}, None))
+        return {"artist-list": []}
+
+    assert quota.call(search) == {"artist-list": []}
+    assert attempts[1] - attempts[0] >= 0.2
+
+
+def test_call_does_not_retry_permanent_errors(lidify):
+    pylast = pytest.importorskip("pylast")
+    quota = lidify.ProviderQuota("lastfm", rate=100, burst=100)
+    attempts = []
+
+    def similar():
+        attempts.append(1)
+        raise pylast.WSError(None, "6", "The artist you supplied could not be found")
+
+    with pytest.raises(pylast.WSError):
+        quota.call(similar)
+    assert len(attempts) == 1
+    assert quota.failures == 0
+
+
+def test_throttled_acquire_returns_as_soon_as_the_session_stops(lidify):
+    quota = lidify.ProviderQuota("stub", rate=0.1, burst=1)
+    stop_event = threading.Event()
+    quota.acquire(stop_event)
+    threading.Timer(0.1, stop_event.set).start()
+
+    started = time.monotonic()
+    with pytest.raises(lidify.ProviderCancelledError):
+        quota.acquire(stop_event)
+    assert time.monotonic() - started < 1
+
+
+def test_requests_made_under_a_stopped_session_are_not_sent(lidify, server):
+    quota, session = limited_session(lidify, rate=0.1, burst=1)
+    stop_event = threading.Event()
+    threading.Timer(0.1, stop_event.set).start()
+
+    started = time.monotonic()
+    with lidify.ProviderQuota.cancelled_by(stop_event):
+        assert session.get(server.url).status_code == 200
+        with pytest.raises(lidify.ProviderCancelledError):
+            session.get(server.url)
+    assert time.monotonic() - started < 1
+    assert server.methods == ["GET"]
+    assert quota.requests == 1
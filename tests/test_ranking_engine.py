@@ -0,0 +1,46 @@
+def related(*names):
+    return [{"name": name} for name in names]
+
+
+def test_candidates_seen_from_more_seeds_rank_higher(lidify):
+    ranking_engine = lidify.RankingEngine()
+    ranking_engine.add_seed("Radiohead", related("Muse", "Portishead", "Massive Attack"))
+    ranking_engine.add_seed("Bjork", related("Massive Attack", "Sigur Ros"))
+    ranking_engine.add_seed("Tricky", related("Portishead", "Massive Attack"))
+
+    assert [artist["name"] for artist in ranking_engine.top(3, lambda artist_name: False)] == ["Massive Attack", "Portishead", "Muse"]
+
+
+def test_position_weights_follow_a_logarithmic_discount(lidify):
+    ranking_engine = lidify.RankingEngine()
+    ranking_engine.add_seed("Radiohead", related("Muse", "Portishead", "Massive Attack"))
+    ranking_engine.add_seed("Bjork", related("Portishead"))
+
+    assert [artist["name"] for artist in ranking_engine.top(3, lambda artist_name: False)] == ["Portishead", "Muse", "Massive Attack"]
+
+
+def test_repeated_seed_is_counted_once(lidify):
+    ranking_engine = lidify.RankingEngine()
+    ranking_engine.add_seed("Radiohead", related("Muse", "Portishead"))
+    ranking_engine.add_seed("radiohead", related("Portishead"))
+    ranking_engine.add_seed("Bjork", related("Muse"))
+
+    assert ranking_engine.top(1, lambda artist_name: False)[0]["name"] == "Muse"
+
+
+def test_excluded_artists_are_skipped_without_shortening_the_batch(lidify):
+    ranking_engine = lidify.RankingEngine()
+    ranking_engine.add_seed("Radiohead", related("Muse", "Portishead", "Massive Attack", "Tricky"))
+
+    top_artists = ranking_engine.top(2, lambda artist_name: artist_name in ("Muse", "Massive Attack"))
+
+    assert [artist["name"] for artist in top_artists] == ["Portishead", "Tricky"]
+
+
+def test_richest_record_of_a_candidate_is_kept(lidify):
+    ranking_engine = lidify.RankingEngine()
+    ranking_engine.add_seed("Radiohead", related("Portishead"))
+    ranking_engine.add_seed("Tricky", [{"name": "Portishead", "genres": ["trip hop"], "popularity": 70}])
+    ranking_engine.add_seed("Bjork", related("Portishead"))
+
+    assert ranking_engine.top(1, lambda artist_name: False) == [{"name": "Portishead", "genres": ["trip hop"], "popularity": 70}]
@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.fixture
+def data_handler(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    emitted = []
+    monkeypatch.setattr(lidify.socketio, "emit", lambda event, data=None, room=None: emitted.append((event, room, data)))
+    monkeypatch.setattr(lidify, "join_room", lambda room, sid=None: None)
+    data_handler = lidify.DataHandler()
+    data_handler.emitted = emitted
+    return data_handler
+
+
+def pool_entry(lidify, name, score):
+    return (name, ["radiohead"], score, lidify.Recommendation(name, genres=["Indie"], status="Added"), {"name": name})
+
+
+def loaded_names(emitted, sid):
+    return [card["Name"] for event, room, data in emitted if event == "more_artists_loaded" and room == sid for card in data]
+
+
+def test_discard_only_removes_entries_for_the_given_provider(lidify, data_handler):
+    pool = data_handler.recommendation_pool
+    pool.add("Spotify", [pool_entry(lidify, "Portishead", 1.0)])
+    pool.add("LastFM", [pool_entry(lidify, "Portishead", 1.0)])
+
+    pool.discard("Spotify", ["Portishead"])
+
+    assert pool.names("Spotify") == []
+    assert pool.names("LastFM") == ["Portishead"]
+
+
+def test_new_session_is_served_from_the_pool_on_connect(lidify, data_handler):
+    data_handler.mode = "Spotify"
+    data_handler.recommendation_batch_size = 2
+    data_handler.recommendation_pool.add("Spotify", [pool_entry(lidify, name, score) for name, score in (("Portishead", 3.0), ("Massive Attack", 2.0), ("Tricky", 1.0))])
+    data_handler.recommendation_pool.add("LastFM", [pool_entry(lidify, "Bjork", 9.0)])
+
+    data_handler.sync_artists({"session": "tab"}, "sid-1")
+
+    session = data_handler.get_session("tab")
+    assert [artist.name for artist in session.recommended_artists] == ["Portishead", "Massive Attack"]
+    assert all(artist.status == "" for artist in session.recommended_artists)
+    assert loaded_names(data_handler.emitted, "sid-1") == ["Portishead", "Massive Attack"]
+    assert data_handler.state_store.get("session:tab")[1]["artists"]
+
+
+def test_session_with_cards_is_not_served_from_the_pool(lidify, data_handler):
+    data_handler.mode = "Spotify"
+    data_handler.recommendation_pool.add("Spotify", [pool_entry(lidify, "Portishead", 1.0)])
+    session = data_handler.get_session("tab")
+    session.recommended_artists = [lidify.Recommendation("Tricky")]
+
+    data_handler.sync_artists({"session": "tab"}, "sid-1")
+
+    assert [artist.name for artist in session.recommended_artists] == ["Tricky"]
+    assert session.claimed_artist_names == set()
+
+
+def test_fractional_pool_ttl_from_env(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("recommendation_pool_ttl_hours", "0.5")
+
+    data_handler = lidify.DataHandler()
+
+    assert data_handler.recommendation_pool.ttl_seconds == 1800
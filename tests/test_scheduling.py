@@ -0,0 +1,156 @@
+import threading
+import time
+
+
+def test_emitter_batches_by_size_and_window_without_extra_threads(lidify, monkeypatch):
+    emitted = []
+    monkeypatch.setattr(lidify.socketio, "emit", lambda event, data, room=None: emitted.append((room, [card["Name"] for card in data])))
+    emitter = lidify.ArtistEmitter(batch_window=0.1, max_batch_size=3)
+    thread_count = threading.active_count()
+
+    for name in ["A", "B", "C", "D"]:
+        emitter.queue("first", lidify.Recommendation(name))
+    emitter.queue("second", lidify.Recommendation("E"))
+    emitter.queue("discarded", lidify.Recommendation("F"))
+    emitter.discard("discarded")
+
+    assert emitted == [("first", ["A", "B", "C"])]
+    assert threading.active_count() == thread_count
+    time.sleep(0.25)
+    assert sorted(emitted[1:]) == [("first", ["D"]), ("second", ["E"])]
+
+
+def test_prefetch_runs_as_one_deduplicated_job_per_session(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_handler = lidify.DataHandler()
+    data_handler.prefetch_batches = 1
+    started = threading.Semaphore(0)
+    release = threading.Event()
+    runs = []
+
+    def prefetch_worker(session, generation):
+        runs.append(session.session_id)
+        started.release()
+        release.wait(5)
+
+    monkeypatch.setattr(data_handler, "prefetch_worker", prefetch_worker)
+    sessions = [data_handler.get_session(session_id) for session_id in ("first", "second", "third")]
+    for session in sessions:
+        session.stop_event.clear()
+
+    data_handler.schedule_prefetch(sessions[0])
+    data_handler.schedule_prefetch(sessions[1])
+    assert started.acquire(timeout=5) and started.acquire(timeout=5)
+    for _ in range(3):
+        data_handler.schedule_prefetch(sessions[2])
+    assert data_handler.job_scheduler.depths()["prefetch"] == 1
+    release.set()
+    assert started.acquire(timeout=5)
+    time.sleep(0.05)
+
+    assert sorted(runs) == ["first", "second", "third"]
+
+
+def test_stopped_session_prefetch_is_cancelled(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_handler = lidify.DataHandler()
+    data_handler.prefetch_batches = 1
+    runs = []
+    monkeypatch.setattr(data_handler, "prefetch_worker", lambda session, generation: runs.append(session.session_id))
+    session = data_handler.get_session("tab")
+
+    data_handler.schedule_prefetch(session)
+    time.sleep(0.1)
+
+    assert runs == []
+
+
+def test_discovery_jobs_for_one_session_run_one_at_a_time_in_order(lidify):
+    scheduler = lidify.JobScheduler()
+    scheduler.register("discovery", workers=4, max_pending=8)
+    lock = threading.Lock()
+    running = set()
+    overlaps = []
+    finished = []
+    done = threading.Semaphore(0)
+
+    def job(session_id, label, seconds):
+        with lock:
+            overlaps.append(session_id in running)
+            running.add(session_id)
+        time.sleep(seconds)
+        with lock:
+            running.discard(session_id)
+            finished.append(label)
+        done.release()
+
+    scheduler.submit("discovery", ("start", "tab"), job, "tab", "start", 0.2, serial_key="tab")
+    scheduler.submit("discovery", ("load_more", "tab"), job, "tab", "load_more", 0.05, serial_key="tab")
+    scheduler.submit("discovery", ("load_more", "other"), job, "other", "other", 0.05, serial_key="other")
+    time.sleep(0.1)
+    assert scheduler.depths()["discovery"] == 1
+    assert scheduler.submit("discovery", ("load_more", "tab"), job, "tab", "dropped", 0, serial_key="tab") is False
+    for _ in range(3):
+        assert done.acquire(timeout=5)
+
+    assert finished == ["other", "start", "load_more"]
+    assert not any(overlaps)
+    assert scheduler.depths()["discovery"] == 0
+
+
+def test_second_load_more_runs_after_the_first_instead_of_being_dropped(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_handler = lidify.DataHandler()
+    session = data_handler.get_session("tab")
+    session.stop_event.clear()
+    searches = []
+    done = threading.Semaphore(0)
+
+    def find_similar_artists(session):
+        if session.search_in_progress_flag:
+            searches.append("dropped")
+        else:
+            session.search_in_progress_flag = True
+            time.sleep(0.1)
+            searches.append("searched")
+            session.search_in_progress_flag = False
+        done.release()
+
+    for _ in range(2):
+        data_handler.job_scheduler.submit("discovery", ("load_more", session.session_id), find_similar_artists, session, cancel_event=session.stop_event, serial_key=session.session_id)
+        time.sleep(0.03)
+    assert done.acquire(timeout=5) and done.acquire(timeout=5)
+
+    assert searches == ["searched", "searched"]
+
+
+def test_stop_interrupts_a_throttled_discovery_round(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_handler = lidify.DataHandler()
+    data_handler.mode = "LastFM"
+    quota = data_handler.provider_clients.quota("lastfm")
+    monkeypatch.setattr(quota, "rate", 0.01)
+    monkeypatch.setattr(quota, "tokens", 0.0)
+    similar_calls = []
+
+    class StubArtist:
+        def get_similar(self):
+            similar_calls.append(1)
+            return []
+
+    class StubLastFM:
+        def get_artist(self, artist_name):
+            return StubArtist()
+
+    monkeypatch.setattr(data_handler.provider_clients, "lastfm", lambda: StubLastFM())
+    session = data_handler.get_session("tab")
+    session.seed_scheduler = lidify.SeedScheduler(1, 10)
+    for artist_name in ("Radiohead", "Portishead", "Massive Attack"):
+        session.seed_scheduler.add(artist_name)
+    session.stop_event.clear()
+    threading.Timer(0.2, data_handler.stop, args=(session,)).start()
+
+    started = time.monotonic()
+    assert data_handler.build_recommendation_batch(session) == []
+    assert time.monotonic() - started < 2
+    assert similar_calls == []
@@ -0,0 +1,58 @@
+import pytest
+
+
+@pytest.fixture
+def seed_scheduler(lidify):
+    seed_scheduler = lidify.SeedScheduler(max_depth=2, breadth=2)
+    for name in ("Radiohead", "Bjork"):
+        seed_scheduler.add(name)
+    return seed_scheduler
+
+
+def test_roots_are_expanded_before_the_frontier(seed_scheduler):
+    seed_scheduler.add("Portishead", 1, "radiohead")
+
+    assert sorted(seed_scheduler.next_seeds(2)) == ["Bjork", "Radiohead"]
+    for name in ("Radiohead", "Bjork"):
+        seed_scheduler.mark_expanded(name)
+    assert seed_scheduler.next_seeds(2) == ["Portishead"]
+
+
+def test_depth_and_breadth_bound_the_frontier(seed_scheduler):
+    assert not seed_scheduler.add("Radiohead", 1, "bjork")
+    assert seed_scheduler.add("Portishead", 1, "radiohead")
+    assert seed_scheduler.add("Tricky", 1, "radiohead")
+    assert not seed_scheduler.add("Massive Attack", 1, "radiohead")
+    assert seed_scheduler.add("Massive Attack", 2, "tricky")
+    assert not seed_scheduler.add("Burial", 3, "massive attack")
+
+
+def test_frontier_prefers_children_of_high_yield_seeds(seed_scheduler):
+    seed_scheduler.add("Portishead", 1, "radiohead")
+    seed_scheduler.add("Sigur Ros", 1, "bjork")
+    for name in ("Radiohead", "Bjork"):
+        seed_scheduler.mark_expanded(name)
+
+    seed_scheduler.record_yield({"bjork"})
+    seed_scheduler.record_yield({"bjork", "radiohead"})
+
+    assert seed_scheduler.next_seeds(2) == ["Sigur Ros", "Portishead"]
+
+
+def test_best_source_is_the_shallowest_then_most_productive_seed(seed_scheduler):
+    seed_scheduler.add("Portishead", 1, "radiohead")
+    seed_scheduler.record_yield({"portishead", "portishead"})
+    seed_scheduler.record_yield({"bjork"})
+
+    assert seed_scheduler.best_source({"portishead", "radiohead", "bjork"}) == ("bjork", 0)
+    assert seed_scheduler.best_source({"portishead"}) == ("portishead", 1)
+    assert seed_scheduler.best_source({"unknown"}) == (None, None)
+
+
+def test_ranking_engine_remembers_which_seeds_suggested_a_candidate(lidify):
+    ranking_engine = lidify.RankingEngine()
+    ranking_engine.add_seed("Radiohead", [{"name": "Portishead"}])
+    ranking_engine.add_seed("Tricky", [{"name": "Portishead"}, {"name": "Burial"}])
+
+    assert ranking_engine.sources_of("portishead") == {"radiohead", "tricky"}
+    assert ranking_engine.sources_of("Unknown") == set()
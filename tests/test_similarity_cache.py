@@ -0,0 +1,28 @@
+import time
+
+
+def related(*names):
+    return [{"name": name, "genres": ["Indie"]} for name in names]
+
+
+def test_related_artists_round_trip_singly_and_in_bulk(lidify, tmp_path):
+    cache = lidify.SimilarityCache(str(tmp_path / "similarity_cache.db"), {"Spotify": 1}, max_seeds=10)
+    cache.set_related("Spotify", "Radiohead", related("Portishead", "Massive Attack"))
+
+    assert [artist["name"] for artist in cache.get_related("Spotify", "radiohead")] == ["Portishead", "Massive Attack"]
+    assert cache.get_related("LastFM", "Radiohead") is None
+    assert list(cache.get_related_bulk("Spotify", ["Radiohead", "Bjork"])) == ["radiohead"]
+
+
+def test_bulk_reads_keep_their_seeds_from_being_evicted_first(lidify, tmp_path):
+    cache = lidify.SimilarityCache(str(tmp_path / "similarity_cache.db"), {"Spotify": 1}, max_seeds=3)
+    for seed in ("Radiohead", "Portishead", "Tricky"):
+        cache.set_related("Spotify", seed, related(f"{seed} Tribute"))
+    with cache.connection:
+        cache.connection.execute("UPDATE seeds SET last_used = ?", (time.time() - 600,))
+
+    cache.get_related_bulk("Spotify", ["Radiohead", "Portishead"])
+    cache.set_related("Spotify", "Bjork", related("Sigur Ros"))
+    cache.evict()
+
+    assert sorted(cache.get_related_bulk("Spotify", ["Radiohead", "Portishead", "Tricky", "Bjork"])) == ["bjork", "portishead", "radiohead"]
@@ -0,0 +1,126 @@
+import json
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def worker(lidify, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return lidify.DataHandler
+
+
+def test_settings_file_edits_win_over_stored_settings(lidify, worker, tmp_path):
+    worker()
+    with open(os.path.join(tmp_path, "config", "settings_config.json")) as json_file:
+        settings = json.load(json_file)
+    settings["mode"] = "LastFM"
+    with open(os.path.join(tmp_path, "config", "settings_config.json"), "w") as json_file:
+        json.dump(settings, json_file)
+
+    restarted = worker()
+
+    assert restarted.mode == "LastFM"
+    assert restarted.state_store.get("settings")[1]["mode"] == "LastFM"
+    with open(os.path.join(tmp_path, "config", "settings_config.json")) as json_file:
+        assert json.load(json_file)["mode"] == "LastFM"
+
+
+def test_stored_settings_fill_a_missing_settings_file(lidify, worker, tmp_path):
+    data_handler = worker()
+    data_handler.lidarr_address = "http://lidarr:8686"
+    data_handler.save_config_to_file()
+    os.remove(os.path.join(tmp_path, "config", "settings_config.json"))
+
+    assert worker().lidarr_address == "http://lidarr:8686"
+
+
+def test_reconnecting_tab_sees_latest_session_from_another_worker(lidify, worker):
+    first_worker, second_worker = worker(), worker()
+    stale_session = second_worker.get_session("tab")
+    assert stale_session.recommended_artists == []
+
+    session = first_worker.get_session("tab")
+    session.selected_names = {"Northern Lights"}
+    session.recommended_artists = [lidify.Recommendation("Velvet Harbor", genres=["Indie"], popularity=57, followers=1200)]
+    session.generation = 3
+    first_worker.save_session(session)
+
+    session = second_worker.get_session("tab")
+    assert session is stale_session
+    assert [artist.card() for artist in session.recommended_artists] == [lidify.Recommendation("Velvet Harbor", genres=["Indie"], popularity=57, followers=1200).card()]
+    assert session.selected_names == {"Northern Lights"}
+    assert session.generation == 3
+    assert "Velvet Harbor" in session.recommendation_index
+
+
+def test_session_saved_by_the_same_worker_is_not_reloaded(lidify, worker):
+    data_handler = worker()
+    session = data_handler.get_session("tab")
+    session.recommended_artists = [lidify.Recommendation("Velvet Harbor")]
+    data_handler.save_session(session)
+    recommended_artists = session.recommended_artists
+
+    assert data_handler.get_session("tab").recommended_artists is recommended_artists
+
+
+@pytest.mark.parametrize("message_queue, transports", [("", '["websocket", "polling"]'), ("redis://redis:6379/0", '["websocket"]')])
+def test_scaled_out_pages_connect_over_websocket_only(lidify, monkeypatch, message_queue, transports):
+    monkeypatch.setenv("socketio_message_queue", message_queue)
+
+    page = lidify.app.test_client().get("/").get_data(as_text=True)
+
+    assert f"var socketio_transports = {transports};" in page
+
+
+def test_settings_form_changes_reach_other_workers_without_overriding_their_env(lidify, worker, monkeypatch):
+    first_worker = worker()
+    monkeypatch.setenv("mode", "LastFM")
+    monkeypatch.setenv("root_folder_path", "/music/")
+    second_worker = worker()
+
+    first_worker.update_settings({"lidarr_address": "http://lidarr:8686", "lidarr_api_key": "key", "root_folder_path": "/data/", "spotify_client_id": "", "spotify_client_secret": ""})
+    first_worker.save_config_to_file()
+    second_worker.refresh_shared_state()
+
+    assert second_worker.lidarr_address == "http://lidarr:8686"
+    assert second_worker.lidarr_api_key == "key"
+    assert second_worker.root_folder_path == "/music/"
+    assert second_worker.mode == "LastFM"
+
+
+def test_checkbox_and_status_changes_are_saved_once_per_window(lidify, worker, monkeypatch):
+    monkeypatch.setattr(lidify.socketio, "emit", lambda event, data=None, room=None: None)
+    data_handler = worker()
+    data_handler.session_saver.delay = 0.2
+    data_handler.lidarr_items = [lidify.LibraryArtist(name) for name in ("Radiohead", "Portishead")]
+    data_handler.library_index.rebuild(data_handler.lidarr_items)
+    session = data_handler.get_session("tab")
+    session.recommended_artists = [lidify.Recommendation("Tricky")]
+    session.recommendation_index.rebuild(session.recommended_artists)
+
+    data_handler.sidebar_check(session, {"name": "Radiohead", "checked": True})
+    data_handler.sidebar_check(session, {"name": "Portishead", "checked": True})
+    data_handler.set_artist_status("Tricky", "Queued")
+    data_handler.set_artist_status("Tricky", "Added")
+
+    assert data_handler.state_store.version("session:tab") == 0
+    time.sleep(0.4)
+    assert data_handler.state_store.version("session:tab") == 1
+    version, snapshot = data_handler.state_store.get("session:tab")
+    assert snapshot["selected"] == ["Portishead", "Radiohead"]
+    assert snapshot["artists"][0] == lidify.Recommendation("Tricky", status="Added").row()
+
+
+def test_pending_session_changes_are_saved_when_the_last_tab_disconnects(lidify, worker):
+    data_handler = worker()
+    session = data_handler.get_session("tab")
+    session.connected_sids.add("sid-1")
+    data_handler.sid_sessions["sid-1"] = "tab"
+    session.selected_names = {"Radiohead"}
+    data_handler.session_saver.queue(session)
+
+    data_handler.disconnection("sid-1")
+
+    assert data_handler.state_store.get("session:tab")[1]["selected"] == ["Radiohead"]